@@ -0,0 +1 @@
+"""Benchmarks for statistically; run `python -m bench.run_bench --help`."""
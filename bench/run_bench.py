@@ -0,0 +1,142 @@
+"""
+Time the parser's stages on synthetic logs of several sizes.
+
+    python -m bench.run_bench --tiers 100,1000 --repeat 3
+    python -m bench.run_bench --compare build/bench/<earlier>.json
+
+Results are saved as JSON under build/bench/ for comparison between versions.
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from statistically import statistically as st
+
+from .synthetic import synthetic_lines, wide_tabulate_block, write_log
+
+OUTPUT_DIR = Path("build/bench")
+
+Result = Dict[str, Any]
+
+
+def best_of(func: Callable[[], Any], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def cold(func: Callable[[], Any]) -> Callable[[], Any]:
+    """
+    Run without the table layouts remembered from earlier runs.
+    """
+
+    def run() -> Any:
+        st.Table.layouts.clear()
+        return func()
+
+    return run
+
+
+def varlists(models: int, covariates: int) -> List[List[str]]:
+    """
+    Growing specifications, as from a model sweep adding covariates.
+    """
+    return [
+        [f"x{v}" for v in range(min(covariates, m * 3))] + ["_cons"]
+        for m in range(1, models + 1)
+    ]
+
+
+def bench_tier(commands: int, repeat: int, workdir: Path) -> List[Result]:
+    path = write_log(workdir / f"synthetic_{commands}.log", commands)
+    lines = [""] + path.read_text().splitlines()
+    table = wide_tabulate_block(rows=commands, columns=30)[2:-1]
+    specs = varlists(max(commands // 10, 2), 200)
+    stages = {
+        "TextLog": cold(lambda: st.TextLog(path)),
+        "classify_lines": lambda: st.classify_lines(lines),
+        "find_tables": lambda: st.TextLog.find_tables(lines),
+        "EquationBuilder": lambda: st.EquationBuilder(lines),
+        "Table": cold(lambda: st.Table(table).to_df()),
+        "Table (layout reused)": lambda: st.Table(table).to_df(),
+        "sort_variable_lists": lambda: st.sort_variable_lists(specs),
+    }
+    results = []
+    for name, func in stages.items():
+        seconds = best_of(func, repeat)
+        results.append({"stage": name, "tier": commands, "seconds": seconds})
+        print(f"{name:<22} {commands:>8} {seconds:>10.4f}s", flush=True)
+    return results
+
+
+def bench_startup(repeat: int) -> Result:
+    """
+    What `statistically --version` costs beyond starting the interpreter.
+    """
+
+    def run(*args: str) -> float:
+        return best_of(
+            lambda: subprocess.run(
+                [sys.executable, *args], check=True, stdout=subprocess.DEVNULL
+            ),
+            repeat,
+        )
+
+    seconds = run("-m", "statistically", "--version") - run("-c", "pass")
+    print(f"{'CLI startup':<22} {0:>8} {seconds:>10.4f}s", flush=True)
+    return {"stage": "CLI startup", "tier": 0, "seconds": seconds}
+
+
+def compare(results: List[Result], earlier_path: Path) -> None:
+    earlier = json.loads(earlier_path.read_text())
+    before = {(r["stage"], r["tier"]): r["seconds"] for r in earlier["results"]}
+    print(f"\nCompared with {earlier['version']} ({earlier_path.name}):")
+    for result in results:
+        key = (result["stage"], result["tier"])
+        if key in before:
+            ratio = result["seconds"] / before[key]
+            print(f"{key[0]:<22} {key[1]:>8} {ratio:>9.2f}x")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--tiers", default="100,1000,5000")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", type=Path, default=OUTPUT_DIR)
+    parser.add_argument("--compare", type=Path)
+    args = parser.parse_args(argv)
+
+    results: List[Result] = [bench_startup(args.repeat)]
+    with tempfile.TemporaryDirectory() as workdir:
+        for tier in map(int, args.tiers.split(",")):
+            results += bench_tier(tier, args.repeat, Path(workdir))
+
+    args.output.mkdir(parents=True, exist_ok=True)
+    stamp = time.strftime(r"%Y%m%d-%H%M%S")
+    out_path = args.output / f"bench-{st.__version__}-{stamp}.json"
+    report = {
+        "version": st.__version__,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "timestamp": stamp,
+        "results": results,
+    }
+    out_path.write_text(json.dumps(report, indent=2))
+    print(f"\nSaved {out_path}")
+    if args.compare:
+        compare(results, args.compare)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
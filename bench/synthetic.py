@@ -0,0 +1,110 @@
+"""Generate synthetic Stata logs of any size from the test fixtures."""
+import random
+import re
+from functools import partial
+from itertools import cycle
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Union
+
+from statistically.statistically import Command
+
+FIXTURES = Path(__file__).parent.parent / "test" / "stata" / "basic"
+
+TEMPLATES = {
+    "regress": "regress.txt",
+    "margins": "margins1.txt",
+    "summarize": "summarize.txt",
+    "table": "table.txt",
+    "logit": "logit.txt",
+}
+
+
+def fixture_block(name: str) -> List[str]:
+    """
+    The lines of the first real command (not a comment or `capture`) in a fixture.
+    """
+    lines = [""] + (FIXTURES / TEMPLATES[name]).read_text().splitlines()
+    for cmd in Command.get_commands(lines):
+        if cmd.core == name:
+            return lines[cmd.slice]
+    raise ValueError(f"No {name} command in {TEMPLATES[name]}")
+
+
+def iteration_block(iterations: int = 200) -> List[str]:
+    """
+    A logit with a very long iteration trace.
+    """
+    block = fixture_block("logit")
+    first = next(i for i, l in enumerate(block) if l.startswith("Iteration"))
+    last = max(i for i, l in enumerate(block) if l.startswith("Iteration"))
+    trace = [
+        f"Iteration {i}:   log likelihood = {-27 - 18 / (i + 1):.6f}  "
+        for i in range(iterations)
+    ]
+    return block[:first] + trace + block[last + 1 :]
+
+
+def wide_tabulate_block(rows: int = 50, columns: int = 30) -> List[str]:
+    """
+    A two-way tabulate with many rows and columns.
+    """
+    width = 11
+    labels = "".join(f"{c:>{width}}" for c in range(1, columns + 1))
+    rule = "-" * 11 + "+" + "-" * (width * columns + 1) + "+" + "-" * 11
+    block = [
+        ". tabulate row col",
+        "",
+        f"{'':>10} |{'col':^{width * columns}} |",
+        f"{'row':>10} |{labels} |{'Total':>10}",
+        rule,
+    ]
+    for r in range(1, rows + 1):
+        counts = [(r * 7 + c * 13) % 97 for c in range(1, columns + 1)]
+        cells = "".join(f"{n:>{width}}" for n in counts)
+        block.append(f"{r:>10} |{cells} |{sum(counts):>10}")
+    block.append(rule)
+    return block + [""]
+
+
+def jitter(block: List[str], rng: random.Random) -> List[str]:
+    """
+    Vary the digits of the output (but not the commands) so repeated blocks
+    still differ, keeping every column in place.
+    """
+
+    def digits(line: str) -> str:
+        return re.sub(r"\d", lambda _: str(rng.randrange(10)), line)
+
+    return [line if line.startswith(". ") else digits(line) for line in block]
+
+
+BLOCKS: Dict[str, Callable[[], List[str]]] = {
+    **{name: partial(fixture_block, name) for name in TEMPLATES},
+    "iterations": iteration_block,
+    "tabulate": wide_tabulate_block,
+}
+
+
+def synthetic_lines(
+    commands: int, kinds: Optional[List[str]] = None, seed: int = 0
+) -> List[str]:
+    """
+    The lines of a log with `commands` commands, cycling through block `kinds`.
+    """
+    rng = random.Random(seed)
+    templates = [BLOCKS[kind]() for kind in kinds or BLOCKS]
+    lines = [". log using synthetic.log, text replace", ""]
+    for _, template in zip(range(commands), cycle(templates)):
+        lines += jitter(template, rng)
+    return lines + [". log close"]
+
+
+def write_log(
+    path: Union[Path, str],
+    commands: int,
+    kinds: Optional[List[str]] = None,
+    seed: int = 0,
+) -> Path:
+    path = Path(path)
+    path.write_text("\n".join(synthetic_lines(commands, kinds, seed)) + "\n")
+    return path
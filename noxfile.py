@@ -132,6 +132,11 @@ def test(session):
     session.run("python", "-m", "coverage", "report")
 
 
+@nox.session(python=False)
+def bench(session):
+    session.run("python", "-m", "bench.run_bench", *session.posargs)
+
+
 @nox.session(python=False)
 def test_coverage(session):
     session.run("coveralls", success_codes=[0, 1])
@@ -3,9 +3,10 @@
 import setuptools
 
 setuptools.setup(
-    packages=setuptools.find_packages(),
+    packages=setuptools.find_packages(exclude=["bench"]),
     entry_points={
         "console_scripts": ["statistically = statistically.statistically:main"]
     },
     setup_requires=["pandas", "twine"],
+    extras_require={"export": ["pyarrow"]},
 )
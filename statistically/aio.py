@@ -0,0 +1,71 @@
+"""Parse logs from asyncio code without blocking the event loop."""
+import asyncio
+from concurrent.futures import Executor
+from functools import partial
+from glob import glob
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Iterable, Optional, Tuple, Union
+
+from .statistically import TextLog
+
+ParsedLog = Tuple[str, TextLog]
+
+
+async def parse_log_async(
+    path: Union[Path, str], executor: Optional[Executor] = None, typed: bool = False
+) -> TextLog:
+    """
+    Read a log in a thread, then parse it fully in `executor`.
+
+    The default executor is the loop's thread pool; a ProcessPoolExecutor
+    runs the CPU-bound parsing of several logs truly in parallel.
+    """
+    loop = asyncio.get_running_loop()
+    text = await loop.run_in_executor(None, Path(path).read_text)
+    return await loop.run_in_executor(
+        executor, partial(TextLog.from_text, text, typed=typed)
+    )
+
+
+async def iter_logs_async(
+    pattern: str,
+    limit: int = 8,
+    executor: Optional[Executor] = None,
+    ordered: bool = False,
+    typed: bool = False,
+) -> AsyncIterator[ParsedLog]:
+    """
+    Parse the logs matching a glob, at most `limit` at a time, yielding each
+    (filename, TextLog) as it completes (or in sorted filename order).
+
+    Logs not yet started are cancelled if iteration stops early.
+    """
+    loop = asyncio.get_running_loop()
+    filenames = sorted(await loop.run_in_executor(None, glob, pattern))
+    async for parsed in parse_logs_async(filenames, limit, executor, ordered, typed):
+        yield parsed
+
+
+async def parse_logs_async(
+    filenames: Iterable[str],
+    limit: int = 8,
+    executor: Optional[Executor] = None,
+    ordered: bool = False,
+    typed: bool = False,
+) -> AsyncIterator[ParsedLog]:
+    semaphore = asyncio.Semaphore(limit)
+
+    async def parse_one(filename: str) -> ParsedLog:
+        async with semaphore:
+            return filename, await parse_log_async(filename, executor, typed)
+
+    tasks = [asyncio.ensure_future(parse_one(f)) for f in filenames]
+    pending: Iterable[Awaitable[ParsedLog]] = tasks
+    if not ordered:
+        pending = asyncio.as_completed(tasks)
+    try:
+        for next_done in pending:
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
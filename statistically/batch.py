@@ -0,0 +1,48 @@
+"""Parse many logs across a pool of processes."""
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional, Tuple, Union
+
+from .statistically import Command, CommandResults, TextLog
+
+ParsedFile = Tuple[str, Dict[Command, CommandResults]]
+
+
+def parse_file(filename: str, cache_dir: Optional[str] = None) -> ParsedFile:
+    """
+    Parse one log, returning only its commands and results -- not its lines.
+    """
+    if cache_dir is None:
+        log = TextLog(filename)
+    else:
+        from .cache import ParseCache
+
+        log = ParseCache(cache_dir).load(filename)
+    return filename, dict(log.cmd_dict)
+
+
+def parse_files(
+    filenames: Iterable[Union[Path, str]],
+    jobs: Optional[int] = None,
+    ordered: bool = False,
+    cache_dir: Optional[str] = None,
+) -> Iterator[ParsedFile]:
+    """
+    Parse logs with up to `jobs` processes (default: one per CPU).
+
+    Results stream back as each file completes, or in input order if `ordered`.
+    """
+    names = [str(f) for f in filenames]
+    worker = partial(parse_file, cache_dir=cache_dir)
+    if jobs == 1:
+        yield from map(worker, names)
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        if ordered:
+            yield from executor.map(worker, names)
+            return
+        futures = [executor.submit(worker, name) for name in names]
+        for future in as_completed(futures):
+            yield future.result()
@@ -0,0 +1,146 @@
+"""Opt-in on-disk cache of parsed logs."""
+import json
+import logging
+import os
+import pickle
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Dict, Iterator, List, Optional, Tuple, Union
+
+from .statistically import (
+    PARSER_VERSION,
+    Command,
+    CommandResults,
+    TextLog,
+    file_sha256,
+    parsers_key,
+)
+
+CachedCommand = Tuple[str, int, int, CommandResults]
+
+
+class ParseCache:
+    """
+    Store parsed tables and stats keyed by content hash, parser version and
+    the parsers registered (see `register_parser`).
+
+    A manifest remembers the size, mtime and hash of every file seen, so an
+    unchanged file is recognized without being read again. Once the entries
+    exceed `max_bytes`, the least recently used ones are evicted.
+
+    Every file is written to a unique temporary name and then moved into place,
+    so several processes can share one cache directory.
+    """
+
+    MANIFEST = "manifest.json"
+    SUFFIX = ".pickle"
+
+    def __init__(self, cache_dir: Union[Path, str], max_bytes: int = 1 << 30) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.manifest_path = self.cache_dir / self.MANIFEST
+        self.manifest = self.read_manifest()
+
+    def read_manifest(self) -> Dict[str, List[Union[int, str]]]:
+        try:
+            return dict(json.loads(self.manifest_path.read_text()))
+        except (OSError, ValueError):
+            return {}
+
+    def write_manifest(self, key: str, record: List[Union[int, str]]) -> None:
+        """
+        Add one record to the manifest as it is now, keeping other processes' own.
+
+        Two processes writing at once can still lose a record, which only means
+        that file is hashed again next time.
+        """
+        self.manifest = self.read_manifest()
+        self.manifest[key] = record
+        with self.replacing(self.manifest_path) as manifest_file:
+            manifest_file.write(json.dumps(self.manifest).encode())
+
+    def content_hash(self, path: Path) -> str:
+        stat = path.stat()
+        signature = [stat.st_size, stat.st_mtime_ns]
+        known = self.manifest.get(str(path.resolve()))
+        if known and known[:2] == signature:
+            return str(known[2])
+        digest = file_sha256(path)
+        self.write_manifest(str(path.resolve()), [*signature, digest])
+        return digest
+
+    def entry_path(self, path: Path) -> Path:
+        key = f"{self.content_hash(path)}-{PARSER_VERSION}-{parsers_key()}"
+        return self.cache_dir / f"{key}{self.SUFFIX}"
+
+    def load(self, path: Union[Path, str]) -> TextLog:
+        path = Path(path)
+        entry = self.entry_path(path)
+        cached = self.read_entry(entry)
+        if cached is not None:
+            logging.getLogger().debug(f"Cache hit for {path}: {entry.name}")
+            lines = [""] + path.read_text().splitlines()
+            cmd_dict = {Command(l, s, e): results for l, s, e, results in cached}
+            return TextLog.restore(lines, cmd_dict)
+        log = TextLog(path)
+        self.write_entry(entry, log)
+        return log
+
+    @staticmethod
+    def read_entry(entry: Path) -> Optional[List[CachedCommand]]:
+        try:
+            with entry.open("rb") as cache_file:
+                cached: List[CachedCommand] = pickle.load(cache_file)
+            os.utime(entry)
+        except Exception:  # pylint: disable=broad-except
+            # missing, evicted meanwhile, or pickled by incompatible libraries
+            return None
+        return cached
+
+    def write_entry(self, entry: Path, log: TextLog) -> None:
+        cached = [
+            (cmd.line, cmd.slice.start, cmd.slice.stop, results)
+            for cmd, results in log.cmd_dict.items()
+        ]
+        with self.replacing(entry) as cache_file:
+            pickle.dump(cached, cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.evict()
+
+    @contextmanager
+    def replacing(self, path: Path) -> Iterator[IO[bytes]]:
+        """
+        A new file in the cache directory, moved over `path` once written.
+        """
+        with tempfile.NamedTemporaryFile(
+            dir=self.cache_dir, suffix=".tmp", delete=False
+        ) as temp_file:
+            temp = Path(temp_file.name)
+            try:
+                yield temp_file
+            except BaseException:
+                temp_file.close()
+                temp.unlink()
+                raise
+        temp.replace(path)
+
+    def evict(self) -> None:
+        entries = []
+        for entry in self.cache_dir.glob(f"*{self.SUFFIX}"):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:  # evicted by another process
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in entries:
+            if total <= self.max_bytes:
+                break
+            total -= size
+            logging.getLogger().debug(f"Evicting {entry.name}")
+            try:
+                entry.unlink()
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,134 @@
+"""Line up the coefficients of many models side by side, as Stata's esttab does."""
+
+from typing import (
+    Collection,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    cast,
+)
+
+import numpy as np
+import pandas as pd
+
+from .statistically import (
+    CommandResults,
+    Stats,
+    TextLog,
+    sort_variable_lists,
+    typed_df,
+)
+
+# positions of each field in a standard estimation table, after the labels
+FIELD_COLUMNS = {"coef": 1, "se": 2, "stat": 3, "p": 4, "ci_low": 5, "ci_high": 6}
+DEFAULT_STATS = ("Number of obs", "R-squared")
+
+
+class ModelResults(NamedTuple):
+    """
+    The coefficient table of one estimation command, one list of cells per
+    variable (with every field of FIELD_COLUMNS), plus the command's stats.
+    """
+
+    name: str
+    variables: List[str]
+    estimates: List[List[str]]
+    stats: Stats
+
+
+def is_coefficient_table(df: pd.DataFrame) -> bool:
+    return df.shape[1] > 2 and "std. err" in str(df.columns[2]).lower()
+
+
+def model_results(name: str, results: CommandResults) -> Optional[ModelResults]:
+    """
+    Pick out the (last) coefficient table of a command's results, if any.
+    """
+    *cmd_tables, cmd_stats = results
+    tables = [
+        t for t in cast(List[pd.DataFrame], cmd_tables) if is_coefficient_table(t)
+    ]
+    if not tables:
+        return None
+    rows = [
+        [cell.strip() for cell in row]
+        for row in tables[-1].astype(str).to_numpy().tolist()
+    ]
+    width = max(FIELD_COLUMNS.values()) + 1
+    estimates = [row[1:width] + [""] * (width - len(row)) for row in rows]
+    variables = unique_labels([row[0] for row in rows])
+    return ModelResults(name, variables, estimates, cast(Stats, cmd_stats))
+
+
+def unique_labels(labels: List[str]) -> List[str]:
+    """
+    Number any repeated labels (e.g. from several equations), as `x#2`.
+    """
+    seen: Dict[str, int] = {}
+    unique = []
+    for label in labels:
+        seen[label] = seen.get(label, 0) + 1
+        unique.append(label if seen[label] == 1 else f"{label}#{seen[label]}")
+    return unique
+
+
+def collect_models(
+    logs: Union[TextLog, Iterable[Tuple[str, TextLog]]],
+    cores: Optional[Collection[str]] = None,
+) -> Iterator[ModelResults]:
+    """
+    Every command with a coefficient table, from one log or (filename, log)
+    pairs, optionally only those whose `Command.core` is in `cores`.
+
+    Models are named after their command, with the filename in front for pairs.
+    """
+    pairs = [("", logs)] if isinstance(logs, TextLog) else logs
+    for filename, log in pairs:
+        for cmd, results in log.cmd_dict.items():
+            if cores is not None and cmd.core not in cores:
+                continue
+            name = f"{filename}:{cmd}" if filename else str(cmd)
+            model = model_results(name, results)
+            if model is not None:
+                yield model
+
+
+def coefficient_table(
+    models: Iterable[ModelResults],
+    fields: Sequence[str] = ("coef", "se"),
+    stats: Sequence[str] = DEFAULT_STATS,
+    typed: bool = False,
+) -> pd.DataFrame:
+    """
+    One row per variable, in the order given by sort_variable_lists, then one
+    row per stat; one block of `fields` columns per model.
+
+    Every cell is written straight into a single preallocated array, with
+    blanks where a model lacks a variable or stat.
+    """
+    models = list(models)
+    variables = sort_variable_lists([m.variables for m in models])
+    row_of = {v: i for i, v in enumerate(variables)}
+    positions = [FIELD_COLUMNS[f] - 1 for f in fields]
+    cells = np.full(
+        (len(variables) + len(stats), len(models) * len(fields)), "", dtype=object
+    )
+    for model_num, model in enumerate(models):
+        first = model_num * len(fields)
+        rows = [row_of[v] for v in model.variables]
+        estimates = np.array(model.estimates, dtype=object).reshape(len(rows), -1)
+        cells[rows, first : first + len(fields)] = estimates[:, positions]
+        for stat_num, stat in enumerate(stats):
+            cells[len(variables) + stat_num, first] = model.stats.get(stat, "")
+    columns = pd.MultiIndex.from_product([[m.name for m in models], fields])
+    df = pd.DataFrame(cells, index=[*variables, *stats], columns=columns)
+    if typed:
+        df = typed_df(df.reset_index()).set_index("index")
+        df.index.name = None
+    return df
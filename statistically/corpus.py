@@ -0,0 +1,76 @@
+"""Collect parsed results across many logs into a few large frames."""
+
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, DefaultDict, Dict, Iterable, List, NamedTuple, Union
+
+import pandas as pd
+
+from .statistically import Command, Stats, Table, TextLog, table_cells
+
+TABLE_COLUMNS = ["file", "command", "table", "row", "label", "column", "value"]
+STAT_COLUMNS = ["file", "command", "stat", "value"]
+
+Buffers = DefaultDict[str, Dict[str, List[Union[int, str]]]]
+
+
+class CorpusFrames(NamedTuple):
+    """
+    Long-format frames keyed by command type (`Command.core`).
+    """
+
+    tables: Dict[str, pd.DataFrame]
+    stats: Dict[str, pd.DataFrame]
+
+
+def new_buffers(columns: List[str]) -> Buffers:
+    return defaultdict(lambda: {c: [] for c in columns})
+
+
+def append_row(buffer: Dict[str, List[Union[int, str]]], row: List[Any]) -> None:
+    for column, item in zip(buffer.values(), row):
+        column.append(item)
+
+
+def add_tables(
+    buffer: Dict[str, List[Union[int, str]]],
+    key: List[Union[int, str]],
+    tables: List[Table],
+) -> None:
+    for table_num, table in enumerate(tables):
+        for cell in table_cells(table.columns, table.rows):
+            append_row(buffer, [*key, table_num, *cell])
+
+
+def add_stats(
+    buffer: Dict[str, List[Union[int, str]]],
+    key: List[Union[int, str]],
+    stats: Stats,
+) -> None:
+    for stat, value in stats.items():
+        append_row(buffer, [*key, stat, value])
+
+
+def parse_many(paths: Iterable[Union[Path, str]]) -> CorpusFrames:
+    """
+    Parse every log into plain column buffers, building one frame per command
+    type at the end rather than one small frame per table.
+
+    Each table cell becomes a row keyed by file, command index (within its file)
+    and table index (within its command); `label` repeats the row's first cell.
+    """
+    tables = new_buffers(TABLE_COLUMNS)
+    stats = new_buffers(STAT_COLUMNS)
+    for path in paths:
+        with Path(path).open() as log_file:
+            lines = (line.rstrip("\r\n") for line in log_file)
+            commands = Command.iter_commands(lines, start=1)
+            for cmd_num, (cmd, cmd_lines) in enumerate(commands):
+                key: List[Union[int, str]] = [str(path), cmd_num]
+                cmd_tables, cmd_stats = TextLog.find_results(cmd_lines, core=cmd.core)
+                add_tables(tables[cmd.core], key, cmd_tables)
+                add_stats(stats[cmd.core], key, cmd_stats)
+    return CorpusFrames(
+        tables={core: pd.DataFrame(b) for core, b in tables.items() if b["file"]},
+        stats={core: pd.DataFrame(b) for core, b in stats.items() if b["file"]},
+    )
@@ -0,0 +1,139 @@
+"""Write parsed logs out as JSON lines, Parquet or Arrow, a batch at a time."""
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+from .statistically import Command, CommandResults, Stats, TextLog, table_cells
+
+FORMATS = ("jsonl", "parquet", "arrow")
+TABLE_FIELDS = ["file", "command", "core", "table", "row", "label", "column", "value"]
+STAT_FIELDS = ["file", "command", "core", "stat", "value"]
+
+
+class BatchWriter:
+    """
+    Buffer rows column by column, writing them out every `batch_size` rows.
+    """
+
+    def __init__(
+        self, path: Path, fields: List[str], out_format: str, batch_size: int
+    ) -> None:
+        self.path = path
+        self.fields = fields
+        self.out_format = out_format
+        self.batch_size = batch_size
+        self.buffer: Dict[str, List[Any]] = {f: [] for f in fields}
+        self.rows = 0
+        self.writer: Optional[Any] = None
+        if out_format == "jsonl":
+            self.path.write_text("")
+
+    def append(self, row: List[Any]) -> None:
+        for column, item in zip(self.buffer.values(), row):
+            column.append(item)
+        self.rows += 1
+        if self.rows >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.rows:
+            return
+        if self.out_format == "jsonl":
+            with self.path.open("a") as out_file:
+                for row in zip(*self.buffer.values()):
+                    out_file.write(json.dumps(dict(zip(self.fields, row))) + "\n")
+        else:
+            self.write_arrow()
+        self.buffer = {f: [] for f in self.fields}
+        self.rows = 0
+
+    def write_arrow(self) -> None:
+        try:
+            import pyarrow as pa  # type: ignore
+            import pyarrow.parquet as pq  # type: ignore
+        except ImportError as err:
+            raise SystemExit(f"{self.out_format} output requires pyarrow") from err
+
+        batch = pa.RecordBatch.from_pydict(self.buffer)
+        if self.writer is None:
+            if self.out_format == "parquet":
+                self.writer = pq.ParquetWriter(self.path, batch.schema)
+            else:
+                self.writer = pa.ipc.new_file(self.path, batch.schema)
+        if self.out_format == "parquet":
+            self.writer.write_table(pa.Table.from_batches([batch]))
+        else:
+            self.writer.write_batch(batch)
+
+    def close(self) -> None:
+        self.flush()
+        if self.writer is not None:
+            self.writer.close()
+
+
+class LogExporter:
+    """
+    Write the tables and stats of each log to `tables.<format>` and
+    `stats.<format>` in `output_dir`, one long-format row per cell or stat.
+    """
+
+    def __init__(
+        self,
+        output_dir: Union[Path, str],
+        out_format: str = "jsonl",
+        batch_size: int = 50_000,
+    ) -> None:
+        if out_format not in FORMATS:
+            raise ValueError(f"Format {out_format!r} not one of {FORMATS}")
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        self.tables = BatchWriter(
+            output_dir / f"tables.{out_format}", TABLE_FIELDS, out_format, batch_size
+        )
+        self.stats = BatchWriter(
+            output_dir / f"stats.{out_format}", STAT_FIELDS, out_format, batch_size
+        )
+
+    def add(self, filename: str, cmd_dict: Mapping[Command, CommandResults]) -> None:
+        for cmd_num, (cmd, items) in enumerate(cmd_dict.items()):
+            *cmd_tables, cmd_stats = items
+            key = [filename, cmd_num, cmd.core]
+            for table_num, df in enumerate(cmd_tables):
+                self.add_table(key + [table_num], df)
+            self.add_stats(key, cast_stats(cmd_stats))
+
+    def add_table(self, key: List[Any], df: Any) -> None:
+        columns = [str(c) for c in df.columns]
+        rows = df.itertuples(index=False, name=None)
+        for row_num, label, column, value in table_cells(columns, rows):
+            self.tables.append([*key, row_num, str(label), column, str(value)])
+
+    def add_stats(self, key: List[Any], stats: Stats) -> None:
+        for stat, value in stats.items():
+            self.stats.append([*key, stat, str(value)])
+
+    def close(self) -> None:
+        self.tables.close()
+        self.stats.close()
+
+    def __enter__(self) -> "LogExporter":
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.close()
+
+
+def cast_stats(item: Any) -> Stats:
+    if not isinstance(item, Mapping):
+        raise TypeError(f"Expected stats as the last result, not {type(item)}")
+    return item
+
+
+def export_logs(
+    logs: Iterable[Tuple[str, TextLog]],
+    output_dir: Union[Path, str],
+    out_format: str = "jsonl",
+) -> None:
+    with LogExporter(output_dir, out_format) as exporter:
+        for filename, log in logs:
+            exporter.add(filename, log.cmd_dict)
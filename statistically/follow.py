@@ -0,0 +1,116 @@
+"""Parse a Stata log incrementally while it is still being written."""
+import locale
+import logging
+import time
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from .statistically import Command, CommandGrouper, Stats, TextLog
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+ParsedCommand = Tuple[Command, List["pd.DataFrame"], Stats]
+
+
+class LogFollower:
+    """
+    Remember how far into a log we have read, and parse only what is appended.
+
+    A command is emitted once the next prompt closes it; the last command of a
+    finished log can be collected with `flush`.
+    """
+
+    def __init__(self, path: Union[Path, str]) -> None:
+        self.path = Path(path)
+        self.encoding = locale.getpreferredencoding(False)
+        self.reset()
+
+    def reset(self) -> None:
+        self.offset = 0
+        # line numbers start at 1, as in TextLog
+        self.grouper = CommandGrouper(start=1)
+
+    def read_new_lines(self) -> List[str]:
+        try:
+            size = self.path.stat().st_size
+        except FileNotFoundError:
+            return []
+        if size < self.offset:
+            logging.getLogger().debug(f"{self.path} shrank; starting over")
+            self.reset()
+        if size == self.offset:
+            return []
+        with self.path.open("rb") as log_file:
+            log_file.seek(self.offset)
+            appended = log_file.read(size - self.offset)
+        # hold back any partial line until its newline has been written
+        complete = appended[: appended.rfind(b"\n") + 1]
+        self.offset += len(complete)
+        return [
+            line.rstrip("\r")
+            for line in complete.decode(self.encoding).split("\n")[:-1]
+        ]
+
+    def poll(self) -> List[ParsedCommand]:
+        closed = (self.grouper.feed(line) for line in self.read_new_lines())
+        return [self.parse(*c) for c in closed if c is not None]
+
+    def flush(self) -> List[ParsedCommand]:
+        closed = self.grouper.flush()
+        return [] if closed is None else [self.parse(*closed)]
+
+    @staticmethod
+    def parse(cmd: Command, lines: List[str]) -> ParsedCommand:
+        logging.getLogger().debug(cmd)
+        cmd_tables, cmd_stats = TextLog.parse_command(lines, core=cmd.core)
+        return cmd, cmd_tables, cmd_stats
+
+
+def follow(
+    path: Union[Path, str],
+    interval: float = 1.0,
+    until: Optional[Callable[[], bool]] = None,
+) -> Iterator[ParsedCommand]:
+    """
+    Yield each command of a growing log as soon as it is closed.
+
+    Polls every `interval` seconds until `until()` is true (forever by default),
+    then yields whatever command was still open.
+    """
+    follower = LogFollower(path)
+    while True:
+        yield from follower.poll()
+        if until is not None and until():
+            break
+        time.sleep(interval)
+    yield from follower.poll()
+    yield from follower.flush()
+
+
+def report_follow(path: Union[Path, str], interval: float = 1.0) -> None:
+    """
+    Print commands as they complete, until interrupted.
+    """
+    follower = LogFollower(path)
+    try:
+        while True:
+            report_parsed(follower.poll())
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        report_parsed(follower.poll() + follower.flush())
+
+
+def report_parsed(parsed: List[ParsedCommand]) -> None:
+    for cmd, cmd_tables, cmd_stats in parsed:
+        print(cmd)
+        for item in [*cmd_tables, cmd_stats]:
+            print(item)
@@ -0,0 +1,170 @@
+"""An inverted index of where commands, row labels and stats occur in many logs."""
+import os
+import pickle
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+    cast,
+)
+
+from .statistically import (
+    Command,
+    CommandResults,
+    TextLog,
+    __version__,
+)
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+CommandKey = Tuple[str, str]
+
+
+class Location(NamedTuple):
+    """
+    A table of a command in a file; `table` is -1 for the command as a whole.
+    """
+
+    file: str
+    command: str
+    table: int = -1
+
+
+class CorpusIndex:
+    """
+    Map each `Command.core`, table row label and stat key to where it occurs.
+
+    Files are added (or re-added, replacing what was there) one at a time, and
+    `update` only reads those whose size or mtime changed since last indexed.
+    """
+
+    def __init__(self) -> None:
+        self.commands: Dict[str, Set[CommandKey]] = {}
+        self.labels: Dict[str, Set[Location]] = {}
+        self.stats: Dict[str, Set[CommandKey]] = {}
+        self.files: Dict[str, Tuple[int, int]] = {}
+        self.entries: Dict[str, List[Tuple[str, str, Union[CommandKey, Location]]]] = {}
+
+    def add_log(self, filename: str, log: TextLog) -> None:
+        self.add_results(filename, log.cmd_dict)
+
+    def add_results(
+        self, filename: str, cmd_dict: Mapping[Command, CommandResults]
+    ) -> None:
+        self.remove(filename)
+        for cmd, (*cmd_tables, cmd_stats) in cmd_dict.items():
+            dfs = cast(List["pd.DataFrame"], cmd_tables)
+            labels = [[str(l).strip() for l in df.iloc[:, 0]] for df in dfs]
+            self.add_command(filename, cmd, labels, cast(Mapping[str, str], cmd_stats))
+        if os.path.isfile(filename):
+            self.files[filename] = signature(filename)
+
+    def add_file(self, path: Union[Path, str]) -> None:
+        """
+        Index a log straight from its tables' rows, without building DataFrames.
+        """
+        filename = str(path)
+        self.remove(filename)
+        with Path(path).open() as log_file:
+            lines = (line.rstrip("\r\n") for line in log_file)
+            for cmd, cmd_lines in Command.iter_commands(lines, start=1):
+                cmd_tables, cmd_stats = TextLog.find_results(cmd_lines, core=cmd.core)
+                labels = [[row[0] for row in table.rows] for table in cmd_tables]
+                self.add_command(filename, cmd, labels, cmd_stats)
+        self.files[filename] = signature(filename)
+
+    def add_command(
+        self,
+        filename: str,
+        cmd: Command,
+        labels: List[List[str]],
+        stats: Mapping[str, str],
+    ) -> None:
+        key = (filename, str(cmd))
+        entries = self.entries.setdefault(filename, [])
+        self.commands.setdefault(cmd.core, set()).add(key)
+        entries.append(("commands", cmd.core, key))
+        for table_num, table_labels in enumerate(labels):
+            location = Location(filename, str(cmd), table_num)
+            for label in dict.fromkeys(table_labels):
+                self.labels.setdefault(label, set()).add(location)
+                entries.append(("labels", label, location))
+        for stat in stats:
+            self.stats.setdefault(stat, set()).add(key)
+            entries.append(("stats", stat, key))
+
+    def remove(self, filename: str) -> None:
+        for postings, term, item in self.entries.pop(filename, []):
+            found: Dict[str, Set[object]] = getattr(self, postings)
+            items = found.get(term)
+            if items is None:
+                continue
+            items.discard(item)
+            if not items:
+                del found[term]
+        self.files.pop(filename, None)
+
+    def update(self, paths: Iterable[Union[Path, str]]) -> List[str]:
+        """
+        (Re)index the logs that are new or changed, returning their names.
+        """
+        changed = [str(p) for p in paths if self.files.get(str(p)) != signature(p)]
+        for filename in changed:
+            self.add_file(filename)
+        return changed
+
+    def find(
+        self,
+        core: Optional[str] = None,
+        label: Optional[str] = None,
+        stat: Optional[str] = None,
+    ) -> Set[Location]:
+        """
+        Where all the given terms occur together: tables with the `label` (in
+        commands of type `core` and with the `stat`), or else whole commands.
+        """
+        keys: Optional[Set[CommandKey]] = None
+        if core is not None:
+            keys = self.commands.get(core, set())
+        if stat is not None:
+            with_stat = self.stats.get(stat, set())
+            keys = with_stat if keys is None else keys & with_stat
+        if label is None:
+            return {Location(*key) for key in keys or ()}
+        tables = self.labels.get(label, set())
+        if keys is None:
+            return set(tables)
+        return {t for t in tables if (t.file, t.command) in keys}
+
+    def save(self, path: Union[Path, str]) -> None:
+        with Path(path).open("wb") as index_file:
+            pickle.dump((__version__, self.__dict__), index_file)
+
+    @classmethod
+    def load(cls, path: Union[Path, str]) -> "CorpusIndex":
+        """
+        A saved index, or an empty one if missing or from another version.
+        """
+        index = cls()
+        try:
+            with Path(path).open("rb") as index_file:
+                version, state = pickle.load(index_file)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return index
+        if version == __version__:
+            index.__dict__.update(state)
+        return index
+
+
+def signature(path: Union[Path, str]) -> Tuple[int, int]:
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
@@ -1,57 +1,271 @@
 """An empty-featured Stata output scraper/parser."""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import locale
 import logging
+import mmap
 import re
 import sys
+import tracemalloc
+from array import array
+from bisect import bisect_right
+from contextlib import contextmanager, nullcontext
+from functools import wraps
 from glob import glob
-from itertools import groupby
+from heapq import heappop, heappush
+from itertools import accumulate, dropwhile, groupby
 from operator import itemgetter
 from pathlib import Path
-from typing import Any, Dict, Generator, List, Optional, Sequence, Tuple, Union, cast
-
-import pandas as pd
+from time import perf_counter
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    ContextManager,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    TextIO,
+    Tuple,
+    TypeVar,
+    Union,
+    cast,
+)
+
+# pandas and numpy are slow to import, so wait until there is a table to build
+if TYPE_CHECKING:
+    import numpy as np
+    import numpy.typing as npt
+    import pandas as pd
 
 __version__ = "0.1.3"
+# bump whenever parsing output changes, so that cached results are not reused
+PARSER_VERSION = 3
 
 Lines = List[str]
 UserInput = str
+StatValue = Union[str, float]
+Stats = Mapping[str, StatValue]
+CommandResults = List[Union["pd.DataFrame", Stats]]
+CompactResults = List[Union["CompactTable", Stats]]
+FoundResults = Tuple[List["Table"], Dict[str, str]]
+Parser = Callable[[Lines, Optional[bytes]], FoundResults]
+Func = TypeVar("Func", bound=Callable[..., Any])
 
 line_horiz = re.compile(r"(?<=)[-+]+(?=\W)")
 line_only = re.compile(r"^[-+]+$")
+word_char = re.compile(r"\w")
+
+SHOW_MODES = ("full", "tables", "summary", "json", "none")
 
 LINE_HORIZONTAL = "h"
 LINE_HAS_COLUMN = "c"
 LINE_UNUSED = " "
 
+# Flags for the kinds of each line, found once per log by classify_lines
+LINE_PROMPT = 1
+LINE_RULE = 2
+LINE_COLUMN = 4
+LINE_EQUATION = 8
+LINE_ITERATION = 16
+LINE_BLANK = 32
+
+# Equivalents of the per-line patterns, run over the whole text (with a newline
+# in front of every line): kept from matching across line breaks, and consuming
+# the rest of the line once found
+LINE_KIND_PATTERNS = [
+    (LINE_PROMPT, re.compile(r"\n\. \w")),
+    (LINE_RULE, re.compile(r"[-+]+(?=[^\w\n]).*")),
+    (LINE_COLUMN, re.compile(r"(?m)[|+](?=\s|$).*")),
+    (LINE_EQUATION, re.compile(r"[^\S\n]=[^\S\n].*")),
+    (LINE_ITERATION, re.compile(r"\nIteration \d")),
+    (LINE_BLANK, re.compile(r"\n[^\S\n]*(?=\n|\Z)")),
+]
+# a "1" for each character that keeps a table column from being a separator
+OCCUPIED_CODES = bytes(
+    ord("0") if code in (0, *b" |+") else ord("1") for code in range(256)
+)
+TABLE_CODES = bytes(
+    ord(
+        LINE_HORIZONTAL
+        if kind & LINE_RULE
+        else LINE_HAS_COLUMN if kind & LINE_COLUMN else LINE_UNUSED
+    )
+    for kind in range(256)
+)
+
 
 def main() -> int:
 
     if handle_cli_only():
         return 0
     args = sys.argv[1:]
-    try:
-        args.remove("--debug")
-        debug = True
-    except ValueError:
-        debug = False
-    create_logger(debug=debug)
+    create_logger(debug=pop_flag(args, "--debug"))
+    following = pop_flag(args, "--follow")
+    ordered = pop_flag(args, "--ordered")
+    profile_memory = pop_flag(args, "--profile-memory")
+    profile = pop_flag(args, "--profile") or profile_memory
+    cache_dir = pop_option(args, "--cache-dir")
+    jobs = pop_jobs(args)
+    out_format, output = pop_export(args, watching=args[:1] == ["watch"])
+    show = pop_show(args, jobs)
+    if args[:1] == ["watch"]:
+        from .watch import watch_from_args
+
+        return watch_from_args(args[1:], out_format, output)
     raw_input = input_from_args(args)
     logging.getLogger().debug(f"Raw input {raw_input!r}")
-    for filename in glob(raw_input):
-        print("\n", filename, "\n")
-        # print(Path(filename).read_text())
-        log = TextLog(filename)
-        log.report()
-        for cmd, items in log.cmd_dict.items():
-            print(cmd)
-            for item in items:
-                print(item)
-        # for tab in log.tables:
-        #     print(tab.to_df())
-        # print(log.stats)
-        print("\n\n")
+    if following:
+        from .follow import report_follow
+
+        report_follow(raw_input)
+        return 0
+    logs = load_logs(glob(raw_input), jobs, ordered, cache_dir)
+    if profile:
+        if jobs is not None:
+            raise SystemExit("--profile cannot be combined with --jobs")
+        logs = report_profiles(logs, profile_memory)
+    if out_format is not None:
+        from .export import export_logs
+
+        export_logs(logs, output or ".", out_format)
+        return 0
+    out = OutputBuffer()
+    for filename, log in logs:
+        report_log(filename, log, show, out)
+    out.flush()
     return 0
 
 
+def load_logs(
+    filenames: List[str],
+    jobs: Optional[int] = None,
+    ordered: bool = False,
+    cache_dir: Optional[str] = None,
+) -> Iterator[Tuple[str, TextLog]]:
+    if jobs is not None:
+        from .batch import parse_files
+
+        parsed = parse_files(filenames, jobs or None, ordered, cache_dir)
+        for filename, cmd_dict in parsed:
+            # workers send back results only, not the lines
+            yield filename, TextLog.restore([], cmd_dict)
+        return
+    load: Callable[[str], TextLog] = TextLog
+    if cache_dir is not None:
+        from .cache import ParseCache
+
+        load = ParseCache(cache_dir).load
+    for filename in filenames:
+        yield filename, load(filename)
+
+
+def report_log(
+    filename: str, log: TextLog, show: str = "full", out: Optional[OutputBuffer] = None
+) -> None:
+    """
+    Print a log as `show` asks, into `out` if given or else straight to stdout.
+    """
+    if out is None:
+        out = OutputBuffer()
+        report_log(filename, log, show, out)
+        out.flush()
+        return
+    if show == "none":
+        return
+    if show == "json":
+        out.print(json.dumps(log_to_json(filename, log)))
+        return
+    out.print("\n", filename, "\n")
+    if show == "summary":
+        for cmd, (*cmd_tables, cmd_stats) in log.cmd_dict.items():
+            out.print(f"{cmd}: {len(cmd_tables)} tables, {len(cmd_stats)} stats")
+        return
+    # print(Path(filename).read_text())
+    if show == "full":
+        log.report(out)
+    for cmd, items in log.cmd_dict.items():
+        out.print(cmd)
+        for item in items:
+            out.print(item)
+    # for tab in log.tables:
+    #     print(tab.to_df())
+    # print(log.stats)
+    out.print("\n\n")
+
+
+def report_profiles(
+    logs: Iterator[Tuple[str, TextLog]], memory: bool = False
+) -> Iterator[Tuple[str, TextLog]]:
+    """
+    Profile the loading of each log, reporting it to stderr along with the total.
+    """
+    total = ParseProfile(memory)
+    while True:
+        profile = ParseProfile(memory)
+        with profile.activated():
+            loaded = next(logs, None)
+        if loaded is None:
+            break
+        print(f"\n{loaded[0]}\n{profile.report()}", file=sys.stderr)
+        total.merge(profile)
+        yield loaded
+    print(f"\nAll files\n{total.report()}", file=sys.stderr)
+
+
+def log_to_json(filename: str, log: TextLog) -> Dict[str, Any]:
+    commands: List[Dict[str, Any]] = []
+    for cmd, items in log.cmd_dict.items():
+        cmd_tables = cast(List["pd.DataFrame"], items[:-1])
+        tables = [
+            {"columns": [*map(str, df.columns)], "rows": df.to_numpy().tolist()}
+            for df in cmd_tables
+        ]
+        start, end = cmd.slice.start, cmd.slice.stop - 1
+        commands.append(
+            {
+                "command": cmd.core,
+                "start": start,
+                "end": end,
+                "tables": tables,
+                "stats": dict(cast(Stats, items[-1])),
+            }
+        )
+    return {"file": filename, "commands": commands}
+
+
+class OutputBuffer:
+    """
+    Gather everything printed, writing it to the stream in large chunks.
+    """
+
+    def __init__(self, stream: Optional[TextIO] = None, size: int = 1 << 16) -> None:
+        self.stream = stream
+        self.size = size
+        self.buffer = io.StringIO()
+
+    def print(self, *items: Any, sep: str = " ", end: str = "\n") -> None:
+        print(*items, sep=sep, end=end, file=self.buffer)
+        if self.buffer.tell() >= self.size:
+            self.flush()
+
+    def flush(self) -> None:
+        stream = self.stream or sys.stdout
+        stream.write(self.buffer.getvalue())
+        stream.flush()
+        self.buffer = io.StringIO()
+
+
 def handle_cli_only() -> bool:
     args = sys.argv[1:]
     if not args or "-h" in args or "--help" in args:
@@ -63,6 +277,68 @@ def handle_cli_only() -> bool:
     return False
 
 
+def pop_flag(args: List[str], flag: str) -> bool:
+    """
+    Remove a flag from the arguments, reporting whether it was there.
+    """
+    try:
+        args.remove(flag)
+    except ValueError:
+        return False
+    return True
+
+
+def pop_jobs(args: List[str]) -> Optional[int]:
+    jobs = pop_option(args, "--jobs")
+    if jobs is None:
+        return None
+    if not jobs.isdigit():
+        raise SystemExit("--jobs must be a whole number, or 0 for one per CPU")
+    return int(jobs)
+
+
+def pop_show(args: List[str], jobs: Optional[int] = None) -> str:
+    show = pop_option(args, "--show") or "full"
+    if show not in SHOW_MODES:
+        raise SystemExit(f"--show must be one of {', '.join(SHOW_MODES)}")
+    if jobs is not None and show == "full":
+        # workers send back results only, so there are no lines to number
+        logging.getLogger().warning("With --jobs, --show full lists no log lines")
+    return show
+
+
+def pop_export(
+    args: List[str], watching: bool = False
+) -> Tuple[Optional[str], Optional[str]]:
+    """
+    The `--format` and `--output` options; only `watch` has a default format.
+    """
+    from .export import FORMATS
+
+    out_format = pop_option(args, "--format")
+    output = pop_option(args, "--output")
+    if out_format is not None and out_format not in FORMATS:
+        raise SystemExit(f"--format must be one of {', '.join(FORMATS)}")
+    if output is not None and out_format is None and not watching:
+        raise SystemExit("--output needs --format")
+    return out_format, output
+
+
+def pop_option(args: List[str], option: str) -> Optional[str]:
+    """
+    Remove an `--option value` pair from the arguments, returning the value.
+    """
+    if option not in args:
+        return None
+    position = args.index(option)
+    try:
+        value = args[position + 1]
+    except IndexError as err:
+        raise SystemExit(f"{option} requires a value") from err
+    del args[position : position + 2]
+    return value
+
+
 def input_from_args(args: List[str]) -> UserInput:
     """
     Just smash together all arguments from the command line.
@@ -76,6 +352,13 @@ def report_help() -> None:
     Report something useful, at some point.
     """
     print("Try: statistically blah.log")
+    print("Options: --debug, --cache-dir DIR, --follow, --jobs N [--ordered]")
+    print("         --profile, --profile-memory (timings per stage, to stderr)")
+    print("         --format jsonl|parquet|arrow [--output DIR]")
+    print(f"         --show {'|'.join(SHOW_MODES)} (default full)")
+    print("  --jobs 0 uses one process per CPU")
+    print("Or: statistically watch DIR [--store DB] [--format F] [--output DIR]")
+    print("         [--state FILE] [--interval SECONDS] [--settle SECONDS]")
 
 
 def report_version() -> None:
@@ -114,8 +397,121 @@ def create_logger(debug: bool = False, log_file: Optional[str] = None) -> None:
     # return new_logger
 
 
+def debugging() -> bool:
+    """
+    Whether debug messages are wanted, so costly ones are only built if so.
+    """
+    return logging.getLogger().isEnabledFor(logging.DEBUG)
+
+
+class ParseProfile:
+    """
+    Wall time and calls per parsing stage, counts of lines, commands and tables,
+    and optionally the peak memory traced while parsing.
+
+    Stages record into whichever profile is active, and cost one attribute
+    lookup when none is. Their times are inclusive of any stages they call.
+    """
+
+    active: Optional["ParseProfile"] = None
+
+    def __init__(self, memory: bool = False) -> None:
+        self.memory = memory
+        self.seconds: Dict[str, float] = {}
+        self.calls: Dict[str, int] = {}
+        self.counts: Dict[str, int] = {}
+        self.peak_memory = 0
+
+    @contextmanager
+    def activated(self) -> Iterator["ParseProfile"]:
+        previous, ParseProfile.active = ParseProfile.active, self
+        started = self.memory and not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        try:
+            yield self
+        finally:
+            ParseProfile.active = previous
+            if self.memory:
+                peak = tracemalloc.get_traced_memory()[1]
+                self.peak_memory = max(self.peak_memory, peak)
+            if started:
+                tracemalloc.stop()
+
+    def add(self, stage: str, seconds: float) -> None:
+        self.seconds[stage] = self.seconds.get(stage, 0.0) + seconds
+        self.calls[stage] = self.calls.get(stage, 0) + 1
+
+    @classmethod
+    def tally(cls, name: str, count: int) -> None:
+        if cls.active is not None:
+            cls.active.counts[name] = cls.active.counts.get(name, 0) + count
+
+    def merge(self, other: "ParseProfile") -> None:
+        for stage, seconds in other.seconds.items():
+            self.seconds[stage] = self.seconds.get(stage, 0.0) + seconds
+            self.calls[stage] = self.calls.get(stage, 0) + other.calls[stage]
+        for name, count in other.counts.items():
+            self.counts[name] = self.counts.get(name, 0) + count
+        self.peak_memory = max(self.peak_memory, other.peak_memory)
+
+    def report(self) -> str:
+        lines = [f"{'stage':<12} {'calls':>8} {'seconds':>10}"]
+        for stage, seconds in self.seconds.items():
+            lines.append(f"{stage:<12} {self.calls[stage]:>8} {seconds:>10.4f}")
+        lines.append("  ".join(f"{n}: {c}" for n, c in self.counts.items()))
+        if self.memory:
+            lines.append(f"peak memory: {self.peak_memory / (1 << 20):.1f} MiB")
+        return "\n".join(lines)
+
+
+def profiling(profile: Optional[ParseProfile]) -> ContextManager[Any]:
+    return nullcontext() if profile is None else profile.activated()
+
+
+def timed(stage: str) -> Callable[[Func], Func]:
+    """
+    Record the wall time of each call into the active profile, if any.
+    """
+
+    def decorate(func: Func) -> Func:
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            profile = ParseProfile.active
+            if profile is None:
+                return func(*args, **kwargs)
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profile.add(stage, perf_counter() - start)
+
+        return cast(Func, wrapper)
+
+    return decorate
+
+
+@timed("classify")
+def classify_lines(lines: Lines) -> bytes:
+    """
+    Make a single pass over the lines, returning one byte of LINE_* flags each.
+    """
+    if not lines:
+        return b""
+    text = "\n" + "\n".join(lines)
+    # offsets of the newline in front of each line
+    starts = [0, *accumulate(len(l) + 1 for l in lines)]
+    kinds = bytearray(len(lines))
+    for flag, pattern in LINE_KIND_PATTERNS:
+        for matched in pattern.finditer(text):
+            kinds[bisect_right(starts, matched.start()) - 1] |= flag
+    return bytes(kinds)
+
+
 class Command:
 
+    __slots__ = ("core", "slice", "line")
+
     command_pattern = re.compile(r"^\. ([\w]+)")
 
     def __init__(self, line: str, start: int, end: int) -> None:
@@ -127,13 +523,38 @@ class Command:
         self.line = line
 
     @classmethod
-    def get_commands(cls, lines: Lines) -> List["Command"]:
-        comm_lines = [(l, i) for i, l in enumerate(lines) if cls.is_command(l)]
+    @timed("commands")
+    def get_commands(
+        cls, lines: Lines, kinds: Optional[bytes] = None
+    ) -> List["Command"]:
+        if kinds is None:
+            kinds = classify_lines(lines)
+        comm_lines = [(l, i) for i, l in enumerate(lines) if kinds[i] & LINE_PROMPT]
         endings = [i for _, i in comm_lines[1:]] + [len(lines)]
         all_cmds = [cls(*line_info, end) for line_info, end in zip(comm_lines, endings)]
-        logging.getLogger().debug(str(all_cmds))
+        if debugging():
+            logging.getLogger().debug(str(all_cmds))
         return all_cmds
 
+    @classmethod
+    def iter_commands(
+        cls, lines: Iterable[str], start: int = 0
+    ) -> Iterator[Tuple["Command", Lines]]:
+        """
+        Group a stream of lines into commands without holding the whole log.
+
+        Each command is yielded with its own lines as soon as the next prompt
+        closes it; `start` is the line number of the first line in the stream.
+        """
+        grouper = CommandGrouper(start)
+        for line in lines:
+            closed = grouper.feed(line)
+            if closed is not None:
+                yield closed
+        closed = grouper.flush()
+        if closed is not None:
+            yield closed
+
     @classmethod
     def is_command(cls, line: str) -> bool:
         return cls.command_pattern.search(line) is not None
@@ -147,55 +568,177 @@ class Command:
         return f"<Command({self.core}, {self.slice.start})>"
 
 
+class CommandGrouper:
+    """
+    Accumulate lines one at a time, handing back each command once closed.
+    """
+
+    def __init__(self, start: int = 0) -> None:
+        self.line_num = start
+        self.cmd_line: Optional[str] = None
+        self.cmd_start = start
+        self.cmd_lines: Lines = []
+
+    def feed(self, line: str) -> Optional[Tuple[Command, Lines]]:
+        closed = None
+        if Command.is_command(line):
+            closed = self.flush()
+            self.cmd_line, self.cmd_start = line, self.line_num
+        if self.cmd_line is not None:
+            self.cmd_lines.append(line)
+        self.line_num += 1
+        return closed
+
+    def flush(self) -> Optional[Tuple[Command, Lines]]:
+        """
+        Close out the open command, if any, at the current line.
+        """
+        if self.cmd_line is None:
+            return None
+        closed = Command(self.cmd_line, self.cmd_start, self.line_num), self.cmd_lines
+        self.cmd_line, self.cmd_lines = None, []
+        return closed
+
+
 class TextLog:
 
     column_finder = re.compile(r"[|+]+(\s|$)")
 
-    def __init__(self, path: Union[Path, str]) -> None:
-        self.lines = Path(path).read_text().splitlines()
-        # add a phantom line to sync with doc line numbers
-        self.lines = [""] + self.lines
-        self.commands = self.get_commands(self.lines)
-        self.cmd_dict: Dict[Command, List[Union[pd.DataFrame, Dict[str, str]]]] = {}
-        for cmd in self.commands:
-            logging.getLogger().debug(cmd)
-            cmd_lines = self.lines[cmd.slice]
-            cmd_stats = self.get_stats(cmd_lines)
-            cmd_tables = self.get_tables(cmd_lines)
-            self.cmd_dict[cmd] = [*cmd_tables, cmd_stats]
+    def __init__(
+        self,
+        path: Union[Path, str],
+        lazy: bool = False,
+        typed: bool = False,
+        profile: Union[bool, ParseProfile] = False,
+    ) -> None:
+        """
+        With `profile` (True, or a ParseProfile to add to), the time spent in
+        each stage is kept as `self.profile`, including any lazy parsing later.
+        """
+        if profile is True:
+            profile = ParseProfile()
+        self.profile = profile or ParseProfile.active
+        with profiling(self.profile):
+            self.parse_text(Path(path).read_text(), lazy, typed)
         # self.tables = self.main_tables + self.stats
 
     @classmethod
-    def get_commands(cls, lines: Lines) -> List[Command]:
-        return Command.get_commands(lines)
+    def from_text(cls, text: str, lazy: bool = False, typed: bool = False) -> "TextLog":
+        """
+        Parse the text of a log already read, e.g. by another thread.
+        """
+        log = cls.__new__(cls)
+        log.profile = ParseProfile.active
+        log.parse_text(text, lazy, typed)
+        return log
+
+    def parse_text(self, text: str, lazy: bool = False, typed: bool = False) -> None:
+        # add a phantom line to sync with doc line numbers
+        self.lines = [""] + text.splitlines()
+        self.kinds = classify_lines(self.lines)
+        self.commands = self.get_commands(self.lines, self.kinds)
+        ParseProfile.tally("lines", len(self.lines) - 1)
+        ParseProfile.tally("commands", len(self.commands))
+        self.cmd_dict: Mapping[Command, CommandResults] = LazyCommandDict(
+            self.lines, self.commands, self.kinds, typed, self.profile
+        )
+        if not lazy:
+            self.cmd_dict = dict(self.cmd_dict)
+
+    @classmethod
+    def restore(
+        cls, lines: Lines, cmd_dict: Dict[Command, CommandResults]
+    ) -> "TextLog":
+        """
+        Rebuild a TextLog from previously parsed results, without parsing.
+        """
+        log = cls.__new__(cls)
+        log.profile = None
+        log.lines = lines
+        log.kinds = b""  # only needed to parse, and everything is parsed already
+        log.commands = [*cmd_dict]
+        log.cmd_dict = cmd_dict
+        return log
+
+    def find(self, core: str) -> List[Command]:
+        return [cmd for cmd in self.commands if cmd.core == core]
+
+    @classmethod
+    def parse_command(
+        cls,
+        lines: Lines,
+        kinds: Optional[bytes] = None,
+        typed: bool = False,
+        core: Optional[str] = None,
+    ) -> Tuple[List[pd.DataFrame], Stats]:
+        cmd_tables, cmd_stats = cls.find_results(lines, kinds, core)
+        cmd_dfs = [table.to_df(typed) for table in cmd_tables]
+        return cmd_dfs, typed_stats(cmd_stats) if typed else cmd_stats
+
+    @classmethod
+    def find_results(
+        cls, lines: Lines, kinds: Optional[bytes] = None, core: Optional[str] = None
+    ) -> FoundResults:
+        """
+        Find tables and stats with the parser registered for the command's type
+        (`core`, or else read from its first line), or failing that the generic one.
+        """
+        if core is None:
+            matched = Command.command_pattern.search(lines[0]) if lines else None
+            core = matched.group(1) if matched else ""
+        return PARSERS.get(core, generic_parser)(lines, kinds)
 
     @staticmethod
-    def get_stats(lines: Lines) -> Dict[str, str]:
-        return EquationBuilder(lines).to_dict()
+    def open_mapped(
+        path: Union[Path, str], index_path: Optional[Union[Path, str]] = None
+    ) -> "MappedLog":
+        return MappedLog(path, index_path=index_path)
 
     @classmethod
-    def get_tables(cls, lines: Lines) -> List[pd.DataFrame]:
-        table_slices = cls.find_tables(lines)
+    def get_commands(cls, lines: Lines, kinds: Optional[bytes] = None) -> List[Command]:
+        return Command.get_commands(lines, kinds)
+
+    @staticmethod
+    def get_stats(lines: Lines, kinds: Optional[bytes] = None) -> Dict[str, str]:
+        return EquationBuilder(lines, kinds).to_dict()
+
+    @classmethod
+    def get_tables(
+        cls, lines: Lines, kinds: Optional[bytes] = None, typed: bool = False
+    ) -> List[pd.DataFrame]:
+        return [table.to_df(typed) for table in cls.build_tables(lines, kinds)]
+
+    @classmethod
+    def build_tables(cls, lines: Lines, kinds: Optional[bytes] = None) -> List["Table"]:
+        if kinds is None:
+            kinds = classify_lines(lines)
+        table_slices = cls.find_tables(lines, kinds)
+        ParseProfile.tally("tables", len(table_slices))
         # print(self.table_boundaries)
-        return [Table(lines[ts]).to_df() for ts in table_slices]
+        return [Table(lines[ts], kinds[ts]) for ts in table_slices]
 
-    def report(self) -> None:
-        for i, line in enumerate(self.lines):
-            print(f"{i:>4} {line}")
+    def report(self, out: Optional[OutputBuffer] = None) -> None:
+        numbered = "\n".join(f"{i:>4} {line}" for i, line in enumerate(self.lines))
+        if out is None:
+            print(numbered)
+        else:
+            out.print(numbered)
 
     @classmethod
-    def find_tables(cls, lines: Lines) -> List[slice]:
-        tables_string = "".join(cls.find_line(l) for l in lines)
-        table_quantifier = re.compile(
-            r"""(?x)  # allow these comments
+    @timed("find_tables")
+    def find_tables(cls, lines: Lines, kinds: Optional[bytes] = None) -> List[slice]:
+        if kinds is None:
+            kinds = classify_lines(lines)
+        tables_string = kinds.translate(TABLE_CODES).decode("ascii")
+        table_quantifier = re.compile(r"""(?x)  # allow these comments
             (?<=\b)   # boundary, including start of line
             \w+       # table identifiers
             (?=\b)    # boundary, including end of file
-            """
-        )
+            """)
         table_groups = table_quantifier.finditer(tables_string)
         table_slices = [slice(*x.span()) for x in table_groups if cls.long_enough(x)]
-        logging.getLogger().debug(f"{table_slices}")
+        if debugging():
+            logging.getLogger().debug(f"{table_slices}")
         return table_slices
 
     @classmethod
@@ -204,7 +747,8 @@ class TextLog:
             return False
         start, finish = matched.span()
         if finish - start <= 2:
-            logging.getLogger().debug(f"Lines {start}-{finish} too short for table.")
+            if debugging():
+                logging.getLogger().debug(f"Lines {start}-{finish} too short.")
             return False
         return True
 
@@ -217,25 +761,439 @@ class TextLog:
         return LINE_UNUSED
 
 
+class LazyCommandDict(Mapping[Command, CommandResults]):
+    """
+    Map each command to its tables and stats, parsing only on first access.
+    """
+
+    def __init__(
+        self,
+        lines: Lines,
+        commands: List[Command],
+        kinds: Optional[bytes] = None,
+        typed: bool = False,
+        profile: Optional[ParseProfile] = None,
+    ) -> None:
+        self.lines = lines
+        self.commands = commands
+        self.kinds = classify_lines(lines) if kinds is None else kinds
+        self.typed = typed
+        self.profile = profile
+        self._known = set(commands)
+        self._parsed: Dict[Command, CommandResults] = {}
+
+    def __getitem__(self, cmd: Command) -> CommandResults:
+        if cmd not in self._parsed:
+            if cmd not in self._known:
+                raise KeyError(cmd)
+            logging.getLogger().debug(cmd)
+            with profiling(self.profile):
+                cmd_tables, cmd_stats = TextLog.parse_command(
+                    self.lines[cmd.slice], self.kinds[cmd.slice], self.typed, cmd.core
+                )
+            self._parsed[cmd] = [*cmd_tables, cmd_stats]
+        return self._parsed[cmd]
+
+    def __iter__(self) -> Iterator[Command]:
+        return iter(self.commands)
+
+    def __len__(self) -> int:
+        return len(self.commands)
+
+    def is_parsed(self, cmd: Command) -> bool:
+        return cmd in self._parsed
+
+
+def iter_commands(
+    path: Union[Path, str], typed: bool = False
+) -> Iterator[Tuple[Command, List[pd.DataFrame], Stats]]:
+    """
+    Parse a log one command at a time, reading the file incrementally.
+
+    Line numbers in each Command match those of TextLog (1-based).
+    """
+    with Path(path).open() as log_file:
+        lines = (line.rstrip("\r\n") for line in log_file)
+        for cmd, cmd_lines in Command.iter_commands(lines, start=1):
+            logging.getLogger().debug(cmd)
+            cmd_tables, cmd_stats = TextLog.parse_command(
+                cmd_lines, typed=typed, core=cmd.core
+            )
+            yield cmd, cmd_tables, cmd_stats
+
+
+# parsers for particular command types, keyed by Command.core
+PARSERS: Dict[str, Parser] = {}
+
+
+def register_parser(*cores: str) -> Callable[[Parser], Parser]:
+    """
+    Find the tables and stats of commands of these types (with abbreviations
+    given separately) with the decorated function, taking lines and kinds.
+    """
+
+    def register(parser: Parser) -> Parser:
+        for core in cores:
+            PARSERS[core] = parser
+        return parser
+
+    return register
+
+
+def parsers_key() -> str:
+    """
+    A short digest of which parser handles each command type, to key caches of
+    parsed results on along with PARSER_VERSION.
+    """
+    names = sorted(f"{c}:{p.__module__}.{p.__qualname__}" for c, p in PARSERS.items())
+    return hashlib.sha1("\n".join(names).encode()).hexdigest()[:12]
+
+
+def generic_parser(lines: Lines, kinds: Optional[bytes] = None) -> FoundResults:
+    """
+    Find tables and stats by their look alone, for any command.
+    """
+    if kinds is None:
+        kinds = classify_lines(lines)
+    return TextLog.build_tables(lines, kinds), TextLog.get_stats(lines, kinds)
+
+
+@register_parser(
+    *"generate gen g replace drop keep rename ren label la sort format".split(),
+    *"set use sysuse webuse clear cd".split(),
+)
+def no_results_parser(lines: Lines, kinds: Optional[bytes] = None) -> FoundResults:
+    """
+    Data management, which prints notes at most (and `gen x = ...` is no stat).
+    """
+    return [], {}
+
+
+@register_parser("summarize", "summ", "sum", "su")
+def tables_only_parser(lines: Lines, kinds: Optional[bytes] = None) -> FoundResults:
+    """
+    Commands that print tables but never `key = value` stats.
+    """
+    return TextLog.build_tables(lines, kinds), {}
+
+
+@register_parser("regress", "regres", "regre", "regr", "reg")
+def regress_parser(lines: Lines, kinds: Optional[bytes] = None) -> FoundResults:
+    """
+    The standard output of `regress`: an ANOVA table with the model's stats to
+    its right, then the coefficients. Any other layout is parsed generically.
+    """
+    found = read_regress_layout(lines)
+    return generic_parser(lines, kinds) if found is None else found
+
+
+# the rows of the ANOVA table of `regress`, by their labels, and its rule lines
+ANOVA_LABELS = {0: "Source", 2: "Model", 3: "Residual", 5: "Total"}
+ANOVA_RULES = (1, 4)
+
+
+def read_regress_layout(lines: Lines) -> Optional[FoundResults]:
+    """
+    The tables and stats of `regress` output, read straight from their known
+    places; None unless the output has exactly that layout.
+    """
+    body = [*dropwhile(lambda l: l.startswith("> "), lines[1:])]
+    if "=" in "".join(lines[: len(lines) - len(body)]):
+        return None
+    blocks = [[*b] for blank, b in groupby(body, is_spacer) if not blank]
+    if len(blocks) != 2 or len(blocks[0]) != len(ANOVA_LABELS) + len(ANOVA_RULES):
+        return None
+    anova, coefs = blocks
+    anova_rules = [anova[i] for i in ANOVA_RULES]
+    coef_rules = [l for l in coefs if line_horiz.match(l)]
+    if (
+        any(anova[i].partition("|")[0].strip() != v for i, v in ANOVA_LABELS.items())
+        or not all(line_horiz.match(l) for l in anova_rules)
+        or len(coef_rules) != 3
+        or not (line_only.match(coefs[0]) and line_only.match(coefs[-1]))
+        or any("=" in l for l in coefs)
+    ):
+        return None
+    width = Table.determine_horizontal_range(anova_rules)
+    stats: Dict[str, str] = {}
+    for line in anova:
+        key, equals, value = line[width.stop :].partition("=")
+        if equals and key.strip():
+            stats[key.strip()] = value.strip()
+    anova_table = Table.from_layout([l[width] for l in anova], header_count=1)
+    width = Table.determine_horizontal_range(coef_rules)
+    coef_lines = [l[width] for l in coefs[1:-1]]
+    header_count = coef_lines.index(coef_rules[1][width])
+    ParseProfile.tally("tables", 2)
+    return [anova_table, Table.from_layout(coef_lines, header_count)], stats
+
+
+def is_spacer(line: str) -> bool:
+    """
+    Blank, or an empty prompt (". "), as between blocks of output.
+    """
+    return line.strip() in ("", ".")
+
+
+class CompactLog:
+    """
+    Parsed results of a log in their compact form, without the log's lines.
+
+    Built by streaming the file, so the whole text is never held at once.
+    """
+
+    __slots__ = ("path", "cmd_dict")
+
+    def __init__(self, path: Union[Path, str]) -> None:
+        self.path = str(path)
+        self.cmd_dict: Dict[Command, CompactResults] = {}
+        with Path(path).open() as log_file:
+            lines = (line.rstrip("\r\n") for line in log_file)
+            for cmd, cmd_lines in Command.iter_commands(lines, start=1):
+                cmd_tables, cmd_stats = TextLog.find_results(cmd_lines, core=cmd.core)
+                self.cmd_dict[cmd] = [*(t.to_compact() for t in cmd_tables), cmd_stats]
+
+    @property
+    def commands(self) -> List[Command]:
+        return [*self.cmd_dict]
+
+    def to_dfs(self, cmd: Command) -> CommandResults:
+        return [
+            r.to_df() if isinstance(r, CompactTable) else r for r in self.cmd_dict[cmd]
+        ]
+
+
+class MappedLog:
+    """
+    Random access to the commands of a (large) log through mmap.
+
+    The byte range of every command is kept in a sidecar index next to the log,
+    validated against the log's size and mtime, so that later lookups -- in this
+    process or another -- seek straight to the command they need.
+    """
+
+    INDEX_SUFFIX = ".stidx"
+    command_bytes = re.compile(rb"(?m)^\. \w+")
+
+    def __init__(
+        self, path: Union[Path, str], index_path: Optional[Union[Path, str]] = None
+    ) -> None:
+        self.path = Path(path)
+        self.index_path = Path(index_path or f"{self.path}{self.INDEX_SUFFIX}")
+        self.encoding = locale.getpreferredencoding(False)
+        self._file = self.path.open("rb")
+        stat = self.path.stat()
+        self._signature = [__version__, stat.st_size, stat.st_mtime_ns]
+        self._map = (
+            mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            if stat.st_size
+            else None
+        )
+        self.commands: List[Command] = []
+        self.offsets: List[Tuple[int, int]] = []
+        if not self.load_index():
+            self.build_index()
+            self.save_index()
+
+    def load_index(self) -> bool:
+        try:
+            stored = json.loads(self.index_path.read_text())
+        except (OSError, ValueError):
+            return False
+        if stored.get("signature") != self._signature:
+            logging.getLogger().debug(f"Stale index {self.index_path}")
+            return False
+        for line, start, end, byte_start, byte_end in stored["commands"]:
+            self.commands.append(Command(line, start, end))
+            self.offsets.append((byte_start, byte_end))
+        return True
+
+    def build_index(self) -> None:
+        if self._map is None:
+            return
+        found: List[Tuple[int, int, str]] = []
+        line_num, position = 1, 0
+        for matched in self.command_bytes.finditer(self._map):
+            line_num += self._map[position : matched.start()].count(b"\n")
+            position = matched.start()
+            line_end = self._map.find(b"\n", position)
+            line = self._decode(position, len(self._map) if line_end < 0 else line_end)
+            found.append((line_num, position, line))
+        tail = self._map[position:]
+        total_lines = line_num + tail.count(b"\n") + (not tail.endswith(b"\n"))
+        starts = [(n, b) for n, b, _ in found[1:]] + [(total_lines, len(self._map))]
+        for (line_num, byte_start, line), (end, byte_end) in zip(found, starts):
+            self.commands.append(Command(line, line_num, end))
+            self.offsets.append((byte_start, byte_end))
+
+    def save_index(self) -> None:
+        entries = [
+            [cmd.line, cmd.slice.start, cmd.slice.stop, *offsets]
+            for cmd, offsets in zip(self.commands, self.offsets)
+        ]
+        stored = {"signature": self._signature, "commands": entries}
+        try:
+            self.index_path.write_text(json.dumps(stored))
+        except OSError as err:
+            logging.getLogger().debug(f"Could not write index: {err}")
+
+    def _decode(self, start: int, end: int) -> str:
+        if self._map is None:
+            return ""
+        return self._map[start:end].decode(self.encoding)
+
+    def lines(self, n: int) -> Lines:
+        return self._decode(*self.offsets[n]).splitlines()
+
+    def __len__(self) -> int:
+        return len(self.commands)
+
+    def __getitem__(self, n: int) -> CommandResults:
+        cmd_tables, cmd_stats = TextLog.parse_command(
+            self.lines(n), core=self.commands[n].core
+        )
+        return [*cmd_tables, cmd_stats]
+
+    def find(self, core: str) -> List[int]:
+        return [i for i, cmd in enumerate(self.commands) if cmd.core == core]
+
+    def select(self, core: str) -> Iterator[Tuple[Command, CommandResults]]:
+        for n in self.find(core):
+            yield self.commands[n], self[n]
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> "MappedLog":
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.close()
+
+
+def occupied_mask(lines: Lines) -> int:
+    """
+    A bit for each character column that is not blank (or |, +) on some line.
+
+    Anything beyond Latin-1 is encoded as "?", so occupies its column too.
+    """
+    mask = 0
+    for line in lines:
+        codes = line.encode("latin-1", "replace").translate(OCCUPIED_CODES)
+        mask |= int(codes[::-1] or b"0", 2)
+    return mask
+
+
+def mask_slices(mask: int) -> List[slice]:
+    """
+    The runs of set bits in an occupied_mask, as from Table.column_slices.
+    """
+    bits = f"{mask:b}"[::-1]
+    return [slice(*run.span()) for run in re.finditer("1+", bits)]
+
+
+class TableLayout(NamedTuple):
+    """
+    Where the columns of a table were found, and what they were called.
+    """
+
+    occupied: int
+    slices: List[slice]
+    names: List[str]
+
+
 class Table:
-    def __init__(self, lines: Lines) -> None:
+
+    # layouts seen, keyed by header and rule lines, for tables printed repeatedly
+    layouts: Dict[Tuple[Any, ...], TableLayout] = {}
+    max_layouts = 1024
+
+    @timed("tables")
+    def __init__(self, lines: Lines, kinds: Optional[bytes] = None) -> None:
         # print(*lines, sep="\n")
         self.raw = lines
-        self.cleaned = self.clean_table_lines(lines)
+        self.cleaned = self.clean_table_lines(lines, kinds)
         # for i, line in enumerate(self.cleaned):
         #     print(f"  {i:>2} {line}")
-        self.text_columns = self.parse_columns(self.cleaned)
-        header_count = self.find_header(self.cleaned)
-        column_names = self.create_column_names(self.text_columns, header_count)
+        content_lines = [l for l in self.cleaned if word_char.search(l)]
+        header_count, layout_key = self.layout_key(self.cleaned, content_lines)
+        occupied = occupied_mask(content_lines)
+        layout = self.layouts.get(layout_key)
+        if layout is not None and layout.occupied == occupied:
+            # same header and the same columns in use: only the cells differ
+            ParseProfile.tally("layouts reused", 1)
+            self.text_columns = [[l[cs] for l in content_lines] for cs in layout.slices]
+            column_names = layout.names
+        else:
+            self.text_columns = self.parse_columns(self.cleaned)
+            column_names = self.create_column_names(self.text_columns, header_count)
+            self.remember_layout(layout_key, occupied, column_names)
         # self.columns = [Column(c, self.header_num) for c in self.text_columns]
         # print(self.columns)
         key_rows = [*zip(*self.text_columns)][header_count:]
         # print(key_rows)
-        final_rows = self.finalize_rows(key_rows)
-        self.df = pd.DataFrame(final_rows, columns=column_names)
-        logging.getLogger().debug(f"DF: {self.df.shape}")
+        self.rows = self.finalize_rows(key_rows)
+        self.columns = column_names
+        self.df: Optional[pd.DataFrame] = None
+        if debugging():
+            logging.getLogger().debug(f"Table: {len(self.rows)}x{len(self.columns)}")
         # set_index("colname", verify_integrity=True)
 
+    @classmethod
+    def from_rows(
+        cls, columns: Sequence[str], rows: Sequence[Sequence[str]]
+    ) -> "Table":
+        """
+        A table of known columns and rows, for parsers that read them directly.
+        """
+        table = cls.__new__(cls)
+        table.raw = table.cleaned = []
+        table.text_columns = [[*column] for column in zip(*rows)]
+        table.rows = [tuple(row) for row in rows]
+        table.columns = list(columns)
+        table.df = None
+        return table
+
+    @classmethod
+    @timed("tables")
+    def from_layout(cls, lines: Lines, header_count: int) -> "Table":
+        """
+        A table from lines already cut to its width, of which the first
+        `header_count` name its columns (with rule lines left in or out).
+        """
+        content_lines = [l for l in lines if word_char.search(l)]
+        slices = mask_slices(occupied_mask(content_lines))
+        text_columns = [[l[cs] for l in content_lines] for cs in slices]
+        names = cls.create_column_names(text_columns, header_count)
+        return cls.from_rows(
+            names, cls.finalize_rows([*zip(*text_columns)][header_count:])
+        )
+
+    @classmethod
+    def layout_key(
+        cls, lines: Lines, content_lines: Lines
+    ) -> Tuple[int, Tuple[Any, ...]]:
+        """
+        The header count (as from find_header), and the header and rule lines
+        (with their positions) that identify a table's layout.
+
+        The header lines are those the column names are made from: the first
+        content lines, which may run past a header line with no words in it.
+        """
+        rules = tuple((i, l) for i, l in enumerate(lines) if line_horiz.match(l))
+        header_count = rules[0][0] if rules else 1
+        return header_count, (tuple(content_lines[:header_count]), rules)
+
+    @classmethod
+    def remember_layout(
+        cls, key: Tuple[Any, ...], occupied: int, names: List[str]
+    ) -> None:
+        if len(cls.layouts) >= cls.max_layouts:
+            cls.layouts.clear()
+        cls.layouts[key] = TableLayout(occupied, mask_slices(occupied), names)
+
     @classmethod
     def finalize_rows(cls, rows: List[Tuple[str, ...]]) -> List[Tuple[str, ...]]:
         # print(rows)
@@ -260,8 +1218,16 @@ class Table:
             new_rows.append(new_row)
         return new_rows
 
-    def to_df(self) -> pd.DataFrame:
-        return self.df
+    def to_compact(self) -> CompactTable:
+        return CompactTable(self.columns, self.rows)
+
+    @timed("dataframes")
+    def to_df(self, typed: bool = False) -> pd.DataFrame:
+        if self.df is None:
+            import pandas as pd
+
+            self.df = pd.DataFrame(self.rows, columns=self.columns)
+        return typed_df(self.df) if typed else self.df
 
     @staticmethod
     def create_column_names(
@@ -274,8 +1240,8 @@ class Table:
         return column_names
 
     @classmethod
-    def clean_table_lines(cls, lines: Lines) -> Lines:
-        range_slice = cls.determine_horizontal_range(lines)
+    def clean_table_lines(cls, lines: Lines, kinds: Optional[bytes] = None) -> Lines:
+        range_slice = cls.determine_horizontal_range(lines, kinds)
         cut_lines = [l[range_slice] for l in lines]
         for row in (0, -1):
             if line_only.match(cut_lines[row]):
@@ -284,11 +1250,16 @@ class Table:
         return cut_lines
 
     @classmethod
-    def determine_horizontal_range(cls, lines: Lines) -> slice:
-        line_matches = [line_horiz.search(l) for l in lines if line_horiz.search(l)]
-
-        table_min = min(l.span()[0] for l in line_matches if l is not None)
-        table_max = max(l.span()[-1] + 1 for l in line_matches if l is not None)
+    def determine_horizontal_range(
+        cls, lines: Lines, kinds: Optional[bytes] = None
+    ) -> slice:
+        if kinds is not None:
+            lines = [l for l, kind in zip(lines, kinds) if kind & LINE_RULE]
+        searched = (line_horiz.search(l) for l in lines)
+        line_matches = [l for l in searched if l is not None]
+
+        table_min = min(l.span()[0] for l in line_matches)
+        table_max = max(l.span()[-1] + 1 for l in line_matches)
         return slice(table_min, table_max)
 
     @classmethod
@@ -300,69 +1271,278 @@ class Table:
 
     @classmethod
     def parse_columns(cls, lines: Lines) -> List[List[str]]:
-        content_lines = [l for l in lines if re.search(r"\w", l)]
-        good_cols = cls.find_useful_columns(content_lines)
-        col_slices = [*make_slices(good_cols)]
-        groups_of_columns = [[l[cs] for l in content_lines] for cs in col_slices]
+        content_lines = [l for l in lines if word_char.search(l)]
+        chars = cls.char_matrix(content_lines)
+        col_slices = cls.column_slices(cls.separator_mask(chars))
+        # slice out whole columns at once, reading each row back as a string;
+        # the padding is NUL, which numpy drops, so cells match l[cs] exactly
+        groups_of_columns = [
+            chars[:, cs].copy().view(f"<U{cs.stop - cs.start}").ravel().tolist()
+            for cs in col_slices
+        ]
         return groups_of_columns
 
     @classmethod
     def find_useful_columns(cls, lines: Lines) -> List[int]:
+        import numpy as np
+
+        separators = cls.separator_mask(cls.char_matrix(lines))
+        return [int(i) for i in np.flatnonzero(~separators)]
+
+    @staticmethod
+    def char_matrix(lines: Lines) -> npt.NDArray[np.uint32]:
+        """
+        One row of code points per line, padded out with zeroes.
+        """
+        import numpy as np
+
         full_length = max(len(l) for l in lines)
-        lines = [f"{l:<{full_length}}" for l in lines]
-        rotated_lines = enumerate(zip(*lines))
-        return [i for i, col in rotated_lines if not cls.is_column_sep(col)]
+        padded = np.array(lines, dtype=f"<U{max(full_length, 1)}")
+        return padded.view(np.uint32).reshape(len(lines), -1)
+
+    @staticmethod
+    def separator_mask(chars: npt.NDArray[np.uint32]) -> npt.NDArray[np.bool_]:
+        """
+        Flag the character columns that are blank (or |, +) on every line.
+        """
+        import numpy as np
+
+        sep_chars = [0, *map(ord, " |+")]
+        mask = np.isin(chars, sep_chars).all(axis=0)
+        return cast("npt.NDArray[np.bool_]", mask)
+
+    @staticmethod
+    def column_slices(separators: npt.NDArray[np.bool_]) -> List[slice]:
+        """
+        Vectorized make_slices over the columns that are not separators.
+        """
+        import numpy as np
+
+        good_cols = np.flatnonzero(~separators)
+        if not good_cols.size:
+            return []
+        breaks = np.flatnonzero(np.diff(good_cols) != 1)
+        starts = good_cols[np.r_[0, breaks + 1]]
+        stops = good_cols[np.r_[breaks, good_cols.size - 1]] + 1
+        return [slice(int(a), int(b)) for a, b in zip(starts, stops)]
 
     @staticmethod
     def is_column_sep(seq: Sequence[str]) -> bool:
         return all(x in (" |+") for x in seq)
 
 
+class CompactTable:
+    """
+    A parsed table held column by column: each column's cells are packed into
+    one string plus an array of offsets, and the names are stored once.
+
+    Numeric columns are also kept as an array of int64 or float64 (NaN where
+    missing), so typed frames are built without parsing the text again.
+    """
+
+    __slots__ = ("columns", "_text", "_offsets", "_numbers")
+
+    def __init__(self, columns: Sequence[str], rows: Sequence[Sequence[str]]) -> None:
+        self.columns = tuple(columns)
+        cells = [*zip(*rows)] if rows else [() for _ in self.columns]
+        self._text = tuple("".join(col) for col in cells)
+        self._offsets = tuple(
+            array("L", [0, *accumulate(len(cell) for cell in col)]) for col in cells
+        )
+        self._numbers = tuple(
+            numeric_cells(col) if i else None for i, col in enumerate(cells)
+        )
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return len(self._offsets[0]) - 1 if self._offsets else 0, len(self.columns)
+
+    def column(self, i: int) -> List[str]:
+        text, offsets = self._text[i], self._offsets[i]
+        return [text[a:b] for a, b in zip(offsets, offsets[1:])]
+
+    def rows(self) -> List[Tuple[str, ...]]:
+        return [*zip(*(self.column(i) for i in range(len(self.columns))))]
+
+    def to_df(self, typed: bool = False) -> pd.DataFrame:
+        import pandas as pd
+
+        df = pd.DataFrame(self.rows(), columns=list(self.columns))
+        return typed_df(df, self._numbers) if typed else df
+
+    def __repr__(self) -> str:
+        return f"<CompactTable({', '.join(self.columns)}; {self.shape[0]} rows)>"
+
+
 class EquationBuilder:
+    """
+    The `key = value` pairs of a command's output, scanned line by line.
 
-    SPACER = "                      "
-    EQUALS = r"!!EQUALS!!"
+    A pair runs out from its `=` to the nearest double space (or line end) on
+    either side; `line_numbers` has the index into `lines` of each key.
+    """
 
     exclusion = re.compile(r"^Iteration \d")
     raw_equals = re.compile(r"\s+=\s+")
-
-    def __init__(self, lines: Lines) -> None:
-        vetted_lines = self.vet_lines(lines)
-        # make a giant string -- no reason to keep row by row
-        joined = self.SPACER.join(vetted_lines)
-        # remove space around = (sometimes it's a lot)
-        tagged = "  " + self.raw_equals.sub(self.EQUALS, joined) + "  "
-        # split by double spaces which "should" bracket params
-        segments = [x for x in tagged.split("  ") if self.EQUALS in x]
-        # separate and clean strings into list of tuples
-        self.params = self.parameterize(segments)
+    # finds the same lines as raw_equals, without backtracking over long spaces
+    has_equals = re.compile(r"\s=\s")
+
+    @timed("stats")
+    def __init__(self, lines: Lines, kinds: Optional[bytes] = None) -> None:
+        self.params: List[Tuple[str, str]] = []
+        self.line_numbers: Dict[str, int] = {}
+        for line_num, line in self.numbered_lines(lines, kinds):
+            for key, value in self.scan_line(line):
+                self.params.append((key, value))
+                self.line_numbers[key] = line_num
+        self.mapping = dict(self.params)
+        self._typed: Optional[Dict[str, StatValue]] = None
 
     @classmethod
-    def vet_lines(cls, lines: Lines) -> Lines:
-        good_lines = [l for l in lines if cls.raw_equals.search(l)]
-        no_bad_lines = [l for l in good_lines if not cls.exclusion.search(l)]
-        for line in no_bad_lines:
-            logging.getLogger().debug(line)
-        return no_bad_lines
+    def numbered_lines(
+        cls, lines: Lines, kinds: Optional[bytes] = None
+    ) -> List[Tuple[int, str]]:
+        if kinds is None:
+            good_lines = [
+                (i, l) for i, l in enumerate(lines) if cls.has_equals.search(l)
+            ]
+            numbered = [(i, l) for i, l in good_lines if not cls.exclusion.search(l)]
+        else:
+            wanted = LINE_EQUATION | LINE_ITERATION
+            numbered = [
+                (i, l)
+                for i, (l, k) in enumerate(zip(lines, kinds))
+                if k & wanted == LINE_EQUATION
+            ]
+        if debugging():
+            for _, line in numbered:
+                logging.getLogger().debug(line)
+        return numbered
 
     @classmethod
-    def parameterize(cls, segments: List[str]) -> List[Tuple[str, str]]:
-        return [cls.clean_into_tuple(x) for x in segments]
+    def vet_lines(cls, lines: Lines, kinds: Optional[bytes] = None) -> Lines:
+        return [line for _, line in cls.numbered_lines(lines, kinds)]
 
     @classmethod
-    def clean_into_tuple(cls, s: str) -> Tuple[str, str]:
-        split_tuple = tuple(y.strip() for y in s.split(cls.EQUALS, maxsplit=1))
-        split_tuple = cast(Tuple[str, str], split_tuple)
-        return split_tuple
+    def scan_line(cls, line: str) -> List[Tuple[str, str]]:
+        """
+        Each pair in a line, with the key starting after the last double space
+        before its `=` and the value ending at the first one after it.
+        """
+        equals = [*cls.raw_equals.finditer(line)]
+        bounds = [0, *(m.end() for m in equals)]
+        pairs = []
+        for num, matched in enumerate(equals):
+            key_start = line.rfind("  ", bounds[num], matched.start())
+            key_start = bounds[num] if key_start < 0 else key_start + 2
+            stop = equals[num + 1].start() if num + 1 < len(equals) else len(line)
+            value_end = line.find("  ", matched.end(), stop)
+            value = line[matched.end() : stop if value_end < 0 else value_end]
+            pairs.append((line[key_start : matched.start()].strip(), value.strip()))
+        return pairs
 
     def to_dict(self) -> Dict[str, str]:
-        return dict(self.params)
+        return dict(self.mapping)
+
+    def typed(self) -> Dict[str, StatValue]:
+        if self._typed is None:
+            self._typed = typed_stats(self.mapping)
+        return self._typed
 
     def keys(self) -> List[str]:
-        return list(self.to_dict())
+        return list(self.mapping)
 
     def __getitem__(self, key: str) -> str:
-        return self.to_dict()[key]
+        return self.mapping[key]
+
+
+STATA_MISSING = r"\.[a-z]?"
+STATA_INTEGER = re.compile(r"-?\d+")
+STATA_NUMBER = re.compile(r"-?(\d+\.?\d*|\.\d+)(e[-+]?\d+)?")
+
+
+def typed_df(
+    df: pd.DataFrame, numbers: Sequence[Optional[array[Any]]] = ()
+) -> pd.DataFrame:
+    """
+    Convert every column after the first (the row labels) to int64 or float64,
+    a whole column at a time, where all of its cells are Stata numbers.
+
+    Missing values (".", ".a" ... ".z") and blank cells become NaN; columns with
+    any other text are left alone. Columns already converted, as by
+    numeric_cells, can be passed in `numbers` (by position, None if not).
+    """
+    import numpy as np
+    import pandas as pd
+
+    # built anew from its columns (duplicate names and all), as old pandas
+    # cannot replace a column by position
+    columns = [df.iloc[:, 0]]
+    for i in range(1, df.shape[1]):
+        known = numbers[i] if i < len(numbers) else None
+        if known is None:
+            columns.append(typed_column(df.iloc[:, i]))
+        else:
+            columns.append(pd.Series(np.asarray(known), index=df.index))
+    typed = pd.concat(columns, axis=1)
+    typed.columns = df.columns
+    return typed
+
+
+def typed_column(column: pd.Series) -> pd.Series:
+    import pandas as pd
+
+    cells = column.astype(str).str.strip().str.replace(",", "", regex=False)
+    missing = cells.str.fullmatch(STATA_MISSING) | (cells == "")
+    numbers = pd.to_numeric(cells.mask(missing), errors="coerce")
+    if numbers.isna().sum() > missing.sum() or missing.all():
+        return column
+    if not missing.any() and cells.str.fullmatch(STATA_INTEGER.pattern).all():
+        return pd.Series(numbers.to_numpy(dtype="int64"), index=column.index)
+    return pd.Series(numbers.to_numpy(dtype="float64"), index=column.index)
+
+
+def numeric_cells(cells: Sequence[str]) -> Optional[array[Any]]:
+    """
+    A column's cells converted as typed_column would: int64 ("q") if all are
+    integers, else float64 ("d") with NaN where missing. None where that is
+    unclear (any other text, or nothing but missing values).
+    """
+    values: List[float] = []
+    integers = True
+    for cell in cells:
+        cleaned = cell.strip().replace(",", "")
+        if not cleaned or re.fullmatch(STATA_MISSING, cleaned):
+            values.append(float("nan"))
+            integers = False
+        elif STATA_INTEGER.fullmatch(cleaned):
+            values.append(int(cleaned))
+        elif STATA_NUMBER.fullmatch(cleaned):
+            values.append(float(cleaned))
+            integers = False
+        else:
+            return None
+    if all(value != value for value in values):
+        return None
+    try:
+        return array("q", cast(List[int], values)) if integers else array("d", values)
+    except OverflowError:
+        return None
+
+
+def typed_stats(stats: Mapping[str, str]) -> Dict[str, StatValue]:
+    return {key: typed_value(value) for key, value in stats.items()}
+
+
+def typed_value(value: str) -> StatValue:
+    cleaned = value.strip().replace(",", "")
+    if re.fullmatch(STATA_MISSING, cleaned):
+        return float("nan")
+    if STATA_INTEGER.fullmatch(cleaned):
+        return int(cleaned)
+    if STATA_NUMBER.fullmatch(cleaned):
+        return float(cleaned)
+    return value
 
 
 def make_slices(ids: List[int]) -> Generator[slice, None, None]:
@@ -392,70 +1572,95 @@ def sort_variable_lists(varlists: List[List[str]]) -> List[str]:
 
         egg, spam, ham, mushroom, pancakes, zucchini, toast, bacon, cheese
 
+    Each list only says which items come before which, so together they make
+    a precedence graph. Ties in its topological order go to whichever item was
+    seen first, as do contradictions between lists (the first sort wins).
     """
-    all_unique_items = set(item for sublist in varlists for item in sublist)
-    primary, *secondaries = varlists
-
     lists_with_duplicate_vars = [x for x in varlists if not all_unique(x)]
     if lists_with_duplicate_vars:
         raise ValueError(
             f"Cannot sort with lists that contain duplicates: {lists_with_duplicate_vars}"
         )
 
-    for secondary in secondaries:
-        primary = weave_lists(primary, secondary)
-    final_list = primary
+    items, followers = precedence_graph(varlists)
+    final_list = [items[i] for i in topological_order(followers)]
 
-    if set(final_list) != all_unique_items:
+    if len(final_list) != len(items):
         raise RuntimeError("Failed to capture all items in original lists!?")
-    if not all_unique(final_list):
-        raise RuntimeError("Produced a final list with duplicates?!")
     return final_list
 
 
-def all_unique(seq: Sequence[Any]) -> bool:
-    return len(set(seq)) == len(seq)
-
-
-def weave_lists(primary: List[str], secondary: List[str]) -> List[str]:
-
-    new_list: List[str] = []
-    # pos keeps track of where we are in the primary list
-    pos = 0
-    queued_elements: List[str] = []
-    for elem in secondary:
-
-        # once we go beyond the primary list, every element is appended
-        if pos >= len(primary):
-            new_list += [elem]
+def precedence_graph(varlists: List[List[str]]) -> Tuple[List[str], List[List[int]]]:
+    """
+    Number the items in order of first appearance, listing for each one the
+    numbers of the items directly following it in any list.
+    """
+    rank: Dict[str, int] = {}
+    for varlist in varlists:
+        for item in varlist:
+            rank.setdefault(item, len(rank))
+    edges = {
+        (rank[before], rank[after])
+        for varlist in varlists
+        for before, after in zip(varlist, varlist[1:])
+    }
+    followers: List[List[int]] = [[] for _ in rank]
+    for before, after in edges:
+        followers[before].append(after)
+    return [*rank], followers
+
+
+def topological_order(followers: List[List[int]]) -> List[int]:
+    """
+    Order nodes 0..n-1 so each comes before its followers, taking the lowest
+    ready number first. On a cycle, the lowest number left goes next anyway.
+    """
+    waiting = [0] * len(followers)
+    for after_nodes in followers:
+        for after in after_nodes:
+            waiting[after] += 1
+    ready = [node for node, count in enumerate(waiting) if not count]
+    placed = [False] * len(followers)
+    order: List[int] = []
+    stalled = 0
+    while len(order) < len(followers):
+        if not ready:
+            while placed[stalled]:
+                stalled += 1
+            ready.append(stalled)
+        node = heappop(ready)
+        if placed[node]:
             continue
+        placed[node] = True
+        order.append(node)
+        for after in followers[node]:
+            waiting[after] -= 1
+            if not waiting[after] and not placed[after]:
+                heappush(ready, after)
+    return order
 
-        # otherwise, elements from secondary list are queued to be checked against primary
-        queued_elements += [elem]
 
-        # unrecognized primary elements are passed along to the new list
-        if primary[pos] not in secondary:
-            new_list += [primary[pos]]
-            pos += 1
-            continue
+def file_sha256(path: Union[Path, str], chunk_size: int = 1 << 20) -> str:
+    """
+    The SHA-256 of a file's content, read a chunk at a time.
+    """
+    digest = hashlib.sha256()
+    with Path(path).open("rb") as hashed_file:
+        for chunk in iter(lambda: hashed_file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
 
-        # when a matching existing element is found, in goes the queue
-        if elem == primary[pos]:
-            new_list += queued_elements
-            queued_elements = []
-            pos += 1
-            continue
 
-        # else we continue with our growing queue
+def table_cells(
+    columns: Sequence[Any], rows: Iterable[Sequence[Any]]
+) -> Iterator[Tuple[int, Any, Any, Any]]:
+    """
+    Each cell of a table, in long format: (row number, row label, column, value).
+    """
+    for row_num, row in enumerate(rows):
+        for column, value in zip(columns, row):
+            yield row_num, row[0], column, value
 
-    # now that we have gone through the loop, we might have lingering items
-    leftover_prim = primary[pos:]
-    leftover_seco = queued_elements
-    # the easiest way to handle these is... to sort them together and append
-    if leftover_prim and leftover_seco:
-        new_list += weave_lists(leftover_prim, leftover_seco)
-    else:
-        new_list += [x for x in (leftover_prim + leftover_seco) if x not in new_list]
 
-    # the final sorted list becomes the primary for the next round
-    return new_list
+def all_unique(seq: Sequence[Any]) -> bool:
+    return len(set(seq)) == len(seq)
@@ -0,0 +1,180 @@
+"""Keep the parsed results of many logs in an SQLite database."""
+import sqlite3
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterable, List, Optional, Sequence, Tuple, Union
+
+from .statistically import Command, Lines, TextLog, file_sha256, table_cells
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+SCHEMA = """
+PRAGMA foreign_keys = ON;
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    sha256 TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS commands (
+    id INTEGER PRIMARY KEY,
+    file_id INTEGER NOT NULL REFERENCES files (id) ON DELETE CASCADE,
+    num INTEGER NOT NULL,
+    core TEXT NOT NULL,
+    line TEXT NOT NULL,
+    start INTEGER NOT NULL,
+    stop INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS cells (
+    command_id INTEGER NOT NULL REFERENCES commands (id) ON DELETE CASCADE,
+    table_num INTEGER NOT NULL,
+    row_num INTEGER NOT NULL,
+    label TEXT NOT NULL,
+    col TEXT NOT NULL,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS stats (
+    command_id INTEGER NOT NULL REFERENCES commands (id) ON DELETE CASCADE,
+    stat TEXT NOT NULL,
+    value TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS commands_file ON commands (file_id);
+CREATE INDEX IF NOT EXISTS commands_core ON commands (core);
+CREATE INDEX IF NOT EXISTS cells_command ON cells (command_id);
+CREATE INDEX IF NOT EXISTS cells_label ON cells (label);
+CREATE INDEX IF NOT EXISTS stats_command ON stats (command_id);
+CREATE INDEX IF NOT EXISTS stats_stat ON stats (stat);
+"""
+
+CELLS_QUERY = """
+SELECT files.path AS file, commands.num AS command, commands.core,
+    cells.table_num AS "table", cells.row_num AS "row", cells.label,
+    cells.col AS "column", cells.value
+FROM cells
+JOIN commands ON commands.id = cells.command_id
+JOIN files ON files.id = commands.file_id
+"""
+STATS_QUERY = """
+SELECT files.path AS file, commands.num AS command, commands.core,
+    stats.stat, stats.value
+FROM stats
+JOIN commands ON commands.id = stats.command_id
+JOIN files ON files.id = commands.file_id
+"""
+
+Row = Tuple[Any, ...]
+
+
+class CorpusStore:
+    """
+    A normalized store of files, their commands, table cells and stats.
+
+    Each log is inserted in one transaction, replacing what was kept for it
+    before, unless its content hash is the same as last time.
+    """
+
+    def __init__(self, db_path: Union[Path, str]) -> None:
+        self.connection = sqlite3.connect(str(db_path))
+        self.connection.executescript(SCHEMA)
+
+    def ingest(self, path: Union[Path, str]) -> bool:
+        """
+        Parse and store a log, reporting whether it was new or changed.
+        """
+        filename = str(path)
+        digest = file_sha256(path)
+        known = self.connection.execute(
+            "SELECT sha256 FROM files WHERE path = ?", (filename,)
+        ).fetchone()
+        if known is not None and known[0] == digest:
+            return False
+        with self.connection:
+            self.connection.execute("DELETE FROM files WHERE path = ?", (filename,))
+            file_id = self.connection.execute(
+                "INSERT INTO files (path, sha256) VALUES (?, ?)", (filename, digest)
+            ).lastrowid
+            self.insert_commands(cast_id(file_id), Path(path))
+        return True
+
+    def ingest_many(self, paths: Iterable[Union[Path, str]]) -> List[str]:
+        return [str(path) for path in paths if self.ingest(path)]
+
+    def insert_commands(self, file_id: int, path: Path) -> None:
+        cells: List[Row] = []
+        stats: List[Row] = []
+        with path.open() as log_file:
+            lines = (line.rstrip("\r\n") for line in log_file)
+            commands = Command.iter_commands(lines, start=1)
+            for cmd_num, (cmd, cmd_lines) in enumerate(commands):
+                command_id = cast_id(
+                    self.connection.execute(
+                        "INSERT INTO commands (file_id, num, core, line, start, stop)"
+                        " VALUES (?, ?, ?, ?, ?, ?)",
+                        (file_id, cmd_num, cmd.core, cmd.line, *command_span(cmd)),
+                    ).lastrowid
+                )
+                add_command_rows(command_id, cmd, cmd_lines, cells, stats)
+        self.connection.executemany(
+            "INSERT INTO cells VALUES (?, ?, ?, ?, ?, ?)", cells
+        )
+        self.connection.executemany("INSERT INTO stats VALUES (?, ?, ?)", stats)
+
+    def query(self, sql: str, params: Sequence[Any] = ()) -> "pd.DataFrame":
+        import pandas as pd
+
+        return pd.read_sql_query(sql, self.connection, params=params)
+
+    def cells(
+        self, core: Optional[str] = None, label: Optional[str] = None
+    ) -> "pd.DataFrame":
+        """
+        Table cells in long format, optionally of one command type or row label.
+        """
+        where, params = filters(("commands.core", core), ("cells.label", label))
+        return self.query(CELLS_QUERY + where, params)
+
+    def stats(
+        self, core: Optional[str] = None, stat: Optional[str] = None
+    ) -> "pd.DataFrame":
+        where, params = filters(("commands.core", core), ("stats.stat", stat))
+        return self.query(STATS_QUERY + where, params)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> "CorpusStore":
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.close()
+
+
+def add_command_rows(
+    command_id: int, cmd: Command, lines: Lines, cells: List[Row], stats: List[Row]
+) -> None:
+    cmd_tables, cmd_stats = TextLog.find_results(lines, core=cmd.core)
+    for table_num, table in enumerate(cmd_tables):
+        for cell in table_cells(table.columns, table.rows):
+            cells.append((command_id, table_num, *cell))
+    for stat, value in cmd_stats.items():
+        stats.append((command_id, stat, value))
+
+
+def command_span(cmd: Command) -> Tuple[int, int]:
+    return cmd.slice.start, cmd.slice.stop
+
+
+def cast_id(row_id: Optional[int]) -> int:
+    if row_id is None:
+        raise RuntimeError("SQLite did not report the id of an inserted row")
+    return row_id
+
+
+def filters(*conditions: Tuple[str, Optional[str]]) -> Tuple[str, List[str]]:
+    """
+    A WHERE clause matching each column to its value, skipping those of None.
+    """
+    wanted = [(column, value) for column, value in conditions if value is not None]
+    if not wanted:
+        return "", []
+    clause = " AND ".join(f"{column} = ?" for column, _ in wanted)
+    return f"WHERE {clause}", [value for _, value in wanted]
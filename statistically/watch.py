@@ -0,0 +1,169 @@
+"""Parse the logs landing in a directory, each once it has stopped changing."""
+import json
+import logging
+import os
+import time
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from .statistically import TextLog, pop_option
+
+Signature = Tuple[int, int]
+Sink = Callable[[str], None]
+
+PATTERNS = ("*.log", "*.txt")
+STATE_FILE = ".statistically-watch.json"
+
+
+class DirectoryWatcher:
+    """
+    Hand each new or modified log in `directory` to `sink`, once its size and
+    mtime have held still for `settle` seconds (so it is no longer being written).
+
+    What has been handed over is kept in a state file, surviving restarts.
+    """
+
+    def __init__(
+        self,
+        directory: Union[Path, str],
+        sink: Sink,
+        state_path: Optional[Union[Path, str]] = None,
+        settle: float = 2.0,
+        patterns: Sequence[str] = PATTERNS,
+    ) -> None:
+        self.directory = Path(directory)
+        self.sink = sink
+        self.state_path = Path(state_path or self.directory / STATE_FILE)
+        self.settle = settle
+        self.patterns = patterns
+        self.done = self.read_state()
+        self.pending: Dict[str, Tuple[Signature, float]] = {}
+
+    def read_state(self) -> Dict[str, Signature]:
+        try:
+            state = json.loads(self.state_path.read_text())
+        except (OSError, ValueError):
+            return {}
+        return {path: (size, mtime) for path, (size, mtime) in state.items()}
+
+    def write_state(self) -> None:
+        partial = self.state_path.with_suffix(".partial")
+        partial.write_text(json.dumps(self.done))
+        partial.replace(self.state_path)
+
+    def scan(self) -> Dict[str, Signature]:
+        """
+        The size and mtime of every matching file, from a single directory scan.
+        """
+        found = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.is_file() and any(
+                    fnmatch(entry.name, p) for p in self.patterns
+                ):
+                    stat = entry.stat()
+                    found[entry.path] = (stat.st_size, stat.st_mtime_ns)
+        return found
+
+    def settled(self, now: Optional[float] = None) -> List[str]:
+        """
+        Files changed since handed over, and unchanged for `settle` seconds.
+        """
+        now = time.monotonic() if now is None else now
+        ready = []
+        for path, signature in self.scan().items():
+            if self.done.get(path) == signature:
+                continue
+            seen = self.pending.get(path)
+            if seen is None or seen[0] != signature:
+                self.pending[path] = (signature, now)
+            elif now - seen[1] >= self.settle:
+                ready.append(path)
+        return sorted(ready)
+
+    def poll(self, now: Optional[float] = None) -> List[str]:
+        ready = self.settled(now)
+        for path in ready:
+            signature = self.pending.pop(path)[0]
+            try:
+                self.sink(path)
+            except Exception:  # pylint: disable=broad-except
+                # keep watching; the file is retried once it changes again
+                logging.getLogger().exception(f"Could not parse {path}")
+            self.done[path] = signature
+        if ready:
+            self.write_state()
+        return ready
+
+    def run(
+        self, interval: float = 1.0, until: Optional[Callable[[], bool]] = None
+    ) -> None:
+        while until is None or not until():
+            for path in self.poll():
+                logging.getLogger().info(f"Parsed {path}")
+            time.sleep(interval)
+
+
+def export_sink(output_dir: Union[Path, str], out_format: str = "jsonl") -> Sink:
+    """
+    Export each log into its own subdirectory of `output_dir`, named after it.
+    """
+    from .export import export_logs
+
+    def export(path: str) -> None:
+        export_logs(
+            [(path, TextLog(path))], Path(output_dir) / Path(path).name, out_format
+        )
+
+    return export
+
+
+def store_sink(db_path: Union[Path, str]) -> Sink:
+    from .store import CorpusStore
+
+    store = CorpusStore(db_path)
+
+    def ingest(path: str) -> None:
+        store.ingest(path)
+
+    return ingest
+
+
+def pop_seconds(args: List[str], option: str, default: float) -> float:
+    value = pop_option(args, option)
+    if value is None:
+        return default
+    try:
+        seconds = float(value)
+    except ValueError:
+        seconds = float("nan")
+    if not 0 <= seconds < float("inf"):
+        raise SystemExit(f"{option} must be a number of seconds, not {value!r}")
+    return seconds
+
+
+def watch_from_args(
+    args: List[str], out_format: Optional[str] = None, output: Optional[str] = None
+) -> int:
+    """
+    `statistically watch DIR`, sending logs to `--store DB` or else exporting
+    them in `--format` (default jsonl) under `--output` (default DIR/parsed).
+    """
+    store = pop_option(args, "--store")
+    state = pop_option(args, "--state")
+    interval = pop_seconds(args, "--interval", 1.0)
+    settle = pop_seconds(args, "--settle", 2.0)
+    if len(args) != 1:
+        raise SystemExit("Usage: statistically watch DIR [options]")
+    directory = Path(args[0])
+    if store is not None:
+        sink = store_sink(store)
+    else:
+        sink = export_sink(output or directory / "parsed", out_format or "jsonl")
+    watcher = DirectoryWatcher(directory, sink, state, settle)
+    try:
+        watcher.run(interval)
+    except KeyboardInterrupt:
+        pass
+    return 0
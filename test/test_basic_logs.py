@@ -1,6 +1,10 @@
 # type: ignore
 import pytest
 
+from statistically import statistically as st
+
+from . import STATA_OUTPUT
+
 
 @pytest.mark.parametrize(
     "n, row, col",
@@ -267,3 +271,22 @@ def test_summarize_dict(summarize_df):
         },
     }
     assert expected == summarize_df.to_dict()
+
+
+def test_typed_regress():
+    log = st.TextLog(STATA_OUTPUT / "basic" / "regress.txt", typed=True)
+    anova, coefs, stats = list(log.cmd_dict.values())[0]
+    assert list(anova.dtypes.astype(str))[1:] == ["float64", "int64", "float64"]
+    assert anova["Source"].tolist() == ["Model", "Residual", "Total"]
+    assert anova["df"].tolist() == [2, 71, 73]
+    assert coefs["Coef."].tolist() == [-0.0065879, -1.650029, 41.6797]
+    assert coefs["P>|t|"].tolist() == [0.0, 0.13, 0.0]
+    assert coefs["mpg"].tolist() == ["weight", "foreign", "_cons"]
+    assert stats["Number of obs"] == 74
+    assert stats["R-squared"] == 0.6627
+
+
+def test_typed_nbreg_missing(nbreg_df):
+    typed = st.typed_df(nbreg_df)
+    assert typed["z"].isna().tolist() == [False, False, False, True, True]
+    assert typed["Coef."].dtype == "float64"
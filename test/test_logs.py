@@ -1,7 +1,25 @@
 # type: ignore
+import asyncio
+import io
+import json
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
 import pytest
 
+from bench.synthetic import synthetic_lines, write_log
 from statistically import statistically as st
+from statistically.aio import iter_logs_async, parse_log_async
+from statistically.batch import parse_files
+from statistically.cache import ParseCache
+from statistically.compare import ModelResults, coefficient_table, collect_models
+from statistically.corpus import parse_many
+from statistically.export import LogExporter, export_logs
+from statistically.follow import LogFollower
+from statistically.index import CorpusIndex, Location
+from statistically.store import CorpusStore
+from statistically.watch import DirectoryWatcher, export_sink, watch_from_args
 
 from . import STATA_OUTPUT, get_log_dfs
 
@@ -44,3 +62,677 @@ def test_summarize_does_not_cut_off():
     """
     df = get_log_dfs("summarize")[0]
     assert "Max" in str(df)
+
+
+@pytest.mark.parametrize("log", [*STATA_OUTPUT.glob("**/*.txt")])
+def test_iter_commands_matches_textlog(log):
+    expected = st.TextLog(log).cmd_dict
+    streamed = [*st.iter_commands(log)]
+    assert [str(cmd) for cmd, *_ in streamed] == [str(cmd) for cmd in expected]
+    for (_, tables, stats), items in zip(streamed, expected.values()):
+        *expected_tables, expected_stats = items
+        assert stats == expected_stats
+        assert [t.to_dict() for t in tables] == [t.to_dict() for t in expected_tables]
+
+
+@pytest.mark.parametrize("log", [*STATA_OUTPUT.glob("**/*.txt")])
+def test_mapped_log_matches_textlog(log, tmp_path):
+    expected = st.TextLog(log)
+    index_path = tmp_path / "log.stidx"
+    for _ in range(2):  # build the index, then reuse it
+        with st.TextLog.open_mapped(log, index_path=index_path) as mapped:
+            assert [str(c) for c in mapped.commands] == [
+                str(c) for c in expected.commands
+            ]
+            for n, cmd in enumerate(expected.commands):
+                assert mapped.lines(n) == expected.lines[cmd.slice]
+    assert index_path.exists()
+
+
+def test_mapped_log_rebuilds_stale_index(tmp_path):
+    log = tmp_path / "log.txt"
+    log.write_text((STATA_OUTPUT / "basic" / "regress.txt").read_text())
+    with st.MappedLog(log) as mapped:
+        assert mapped.find("regress") == [0]
+    log.write_text(log.read_text() + "\n. summarize\n")
+    with st.MappedLog(log) as mapped:
+        assert [c.core for c in mapped.commands][-1] == "summarize"
+        [(cmd, results)] = mapped.select("regress")
+        assert results[-1]["Number of obs"] == "74"
+
+
+def test_lazy_textlog_parses_on_access():
+    log = st.TextLog(STATA_OUTPUT / "various" / "longer.txt", lazy=True)
+    eager = st.TextLog(STATA_OUTPUT / "various" / "longer.txt")
+    assert len(log.cmd_dict) == len(eager.cmd_dict)
+    first, *rest = log.commands
+    assert not any(log.cmd_dict.is_parsed(cmd) for cmd in log.commands)
+    assert log.cmd_dict[first] is log.cmd_dict[first]
+    assert not any(log.cmd_dict.is_parsed(cmd) for cmd in rest)
+    for cmd, eager_cmd in zip(log.commands, eager.commands):
+        assert str(log.cmd_dict[cmd]) == str(eager.cmd_dict[eager_cmd])
+
+
+def test_parse_cache_round_trip(tmp_path):
+    log = STATA_OUTPUT / "basic" / "nbreg.txt"
+    cache = ParseCache(tmp_path / "cache")
+    fresh = cache.load(log)
+    [entry] = (tmp_path / "cache").glob("*.pickle")
+    cached = ParseCache(tmp_path / "cache").load(log)
+    assert [str(c) for c in cached.commands] == [str(c) for c in fresh.commands]
+    for fresh_items, cached_items in zip(
+        fresh.cmd_dict.values(), cached.cmd_dict.values()
+    ):
+        assert str(fresh_items) == str(cached_items)
+    assert cached.lines == fresh.lines
+    assert entry.exists()
+
+
+def test_parse_cache_evicts(tmp_path):
+    cache = ParseCache(tmp_path, max_bytes=0)
+    cache.load(STATA_OUTPUT / "basic" / "regress.txt")
+    assert not [*tmp_path.glob("*.pickle")]
+
+
+def test_parse_cache_misses_after_registering_a_parser(tmp_path, monkeypatch):
+    monkeypatch.setattr(st, "PARSERS", dict(st.PARSERS))
+    log = STATA_OUTPUT / "basic" / "regress.txt"
+    ParseCache(tmp_path).load(log)
+
+    @st.register_parser("regress")
+    def custom(lines, kinds=None):
+        return [], {"custom": "1"}
+
+    cached = ParseCache(tmp_path).load(log)
+    assert [*cached.cmd_dict.values()][0] == [{"custom": "1"}]
+
+
+def test_parse_caches_share_a_directory(tmp_path):
+    logs = [tmp_path / "one.txt", tmp_path / "two.txt"]
+    for log in logs:
+        log.write_text((STATA_OUTPUT / "basic" / "regress.txt").read_text())
+    first, second = ParseCache(tmp_path / "cache"), ParseCache(tmp_path / "cache")
+    first.load(logs[0])
+    second.load(logs[1])
+    first.evict()
+    manifest = ParseCache(tmp_path / "cache").manifest
+    assert sorted(manifest) == sorted(str(log.resolve()) for log in logs)
+    assert not [*(tmp_path / "cache").glob("*.tmp")]
+
+
+def test_unreadable_cache_entry_is_a_miss(tmp_path, monkeypatch):
+    log = STATA_OUTPUT / "basic" / "regress.txt"
+    cache = ParseCache(tmp_path)
+    cache.load(log)
+
+    def incompatible(_):
+        raise AttributeError("Can't get attribute 'new_block' on <module>")
+
+    monkeypatch.setattr(pickle, "load", incompatible)
+    assert cache.load(log).cmd_dict
+
+
+def test_follower_parses_only_appended_text(tmp_path):
+    full_text = (STATA_OUTPUT / "various" / "longer.txt").read_text()
+    expected = st.TextLog(STATA_OUTPUT / "various" / "longer.txt").cmd_dict
+    log = tmp_path / "growing.txt"
+    log.write_text("")
+    follower = LogFollower(log)
+    seen = []
+    for start in range(0, len(full_text), 997):
+        with log.open("a") as growing:
+            growing.write(full_text[start : start + 997])
+        seen += follower.poll()
+    assert len(seen) == len(expected) - 1
+    seen += follower.flush()
+    assert [str(cmd) for cmd, *_ in seen] == [str(cmd) for cmd in expected]
+    for (_, tables, stats), items in zip(seen, expected.values()):
+        assert str([*tables, stats]) == str(items)
+
+
+@pytest.mark.parametrize("jobs, ordered", [(1, False), (2, False), (2, True)])
+def test_parse_files_matches_textlog(jobs, ordered):
+    logs = sorted(STATA_OUTPUT.glob("**/*.txt"))
+    results = dict(parse_files(logs, jobs=jobs, ordered=ordered))
+    if ordered:
+        assert [*results] == [str(log) for log in logs]
+    for log in logs:
+        expected = st.TextLog(log).cmd_dict
+        cmd_dict = results[str(log)]
+        assert [str(cmd) for cmd in cmd_dict] == [str(cmd) for cmd in expected]
+        assert str([*cmd_dict.values()]) == str([*expected.values()])
+
+
+def test_parse_many_long_frames():
+    logs = [STATA_OUTPUT / "basic" / f"{name}.txt" for name in ("regress", "nbreg")]
+    frames = parse_many(logs)
+    assert set(frames.tables) == {"regress", "nbreg"}
+    regress = frames.tables["regress"]
+    assert list(regress.columns) == [
+        "file",
+        "command",
+        "table",
+        "row",
+        "label",
+        "column",
+        "value",
+    ]
+    coef = regress.query("table == 1 and label == 'foreign' and column == 'Coef.'")
+    assert list(coef["value"]) == ["-1.650029"]
+    assert len(regress) == 3 * 4 + 3 * 7
+    stats = frames.stats["nbreg"].set_index("stat")["value"]
+    assert stats["Number of obs"] == "21"
+
+
+@pytest.mark.parametrize("log", [*STATA_OUTPUT.glob("**/*.txt")])
+def test_classify_lines_matches_line_by_line(log):
+    lines = log.read_text().splitlines()
+    kinds = st.classify_lines(lines)
+    for line, kind in zip(lines, kinds):
+        assert bool(kind & st.LINE_PROMPT) == st.Command.is_command(line)
+        assert chr(st.TABLE_CODES[kind]) == st.TextLog.find_line(line)
+        equation = st.EquationBuilder.raw_equals.search(line)
+        assert bool(kind & st.LINE_EQUATION) == bool(equation)
+        iteration = st.EquationBuilder.exclusion.search(line)
+        assert bool(kind & st.LINE_ITERATION) == bool(iteration)
+        assert bool(kind & st.LINE_BLANK) == (not line.strip())
+
+
+@pytest.mark.parametrize("log", [*STATA_OUTPUT.glob("**/*.txt")])
+def test_compact_log_matches_textlog(log):
+    expected = st.TextLog(log)
+    compact = st.CompactLog(log)
+    assert [str(c) for c in compact.commands] == [str(c) for c in expected.commands]
+    for cmd, expected_cmd in zip(compact.commands, expected.commands):
+        *tables, stats = compact.cmd_dict[cmd]
+        *expected_tables, expected_stats = expected.cmd_dict[expected_cmd]
+        assert stats == expected_stats
+        for table, expected_table in zip(tables, expected_tables):
+            assert table.shape == expected_table.shape
+            assert table.to_df().to_dict() == expected_table.to_dict()
+            pd.testing.assert_frame_equal(
+                table.to_df(typed=True), st.typed_df(expected_table)
+            )
+        assert str(compact.to_dfs(cmd)) == str(expected.cmd_dict[expected_cmd])
+
+
+def test_compact_table_types_numbers_without_parsing(monkeypatch):
+    table = st.CompactTable(
+        ["x", "n", "coef", "note"],
+        [("a", "1,024", " .5", "yes"), ("b", "2", ".", "no"), ("c", "3", "", "")],
+    )
+    monkeypatch.setattr(st, "typed_column", lambda column: column)
+    df = table.to_df(typed=True)
+    assert df["n"].tolist() == [1024, 2, 3]
+    assert df["coef"].dtype == "float64"
+    assert df["coef"].isna().tolist() == [False, True, True]
+    assert df["note"].tolist() == ["yes", "no", ""]
+
+
+def test_compact_table_round_trips_through_pickle():
+    compact = st.CompactLog(STATA_OUTPUT / "basic" / "regress.txt")
+    restored = pickle.loads(pickle.dumps(compact.cmd_dict))
+    (table, *_), *_ = restored.values()
+    assert table.columns == ("Source", "SS", "df", "MS")
+    assert table.column(0) == ["Model", "Residual", "Total"]
+    assert not hasattr(table, "__dict__")
+
+
+def exported_logs():
+    logs = sorted((STATA_OUTPUT / "basic").glob("*.txt"))
+    return [(str(log), st.TextLog(log)) for log in logs]
+
+
+def test_export_jsonl_in_batches(tmp_path):
+    with LogExporter(tmp_path, "jsonl", batch_size=7) as exporter:
+        for filename, log in exported_logs():
+            exporter.add(filename, log.cmd_dict)
+    rows = [json.loads(l) for l in (tmp_path / "tables.jsonl").read_text().splitlines()]
+    frames = parse_many(STATA_OUTPUT.glob("basic/*.txt"))
+    assert len(rows) == sum(len(df) for df in frames.tables.values())
+    stats = (tmp_path / "stats.jsonl").read_text().splitlines()
+    assert len(stats) == sum(len(df) for df in frames.stats.values())
+    assert '"stat": "Number of obs", "value": "74"' in "".join(stats)
+
+
+@pytest.mark.parametrize("out_format", ["parquet", "arrow"])
+def test_export_columnar(tmp_path, out_format):
+    pa = pytest.importorskip("pyarrow")
+    export_logs(exported_logs(), tmp_path, out_format)
+    path = tmp_path / f"tables.{out_format}"
+    if out_format == "parquet":
+        table = pytest.importorskip("pyarrow.parquet").read_table(path)
+    else:
+        table = pa.ipc.open_file(path).read_all()
+    jsonl = tmp_path / "jsonl"
+    export_logs(exported_logs(), jsonl, "jsonl")
+    assert table.num_rows == len((jsonl / "tables.jsonl").read_text().splitlines())
+    assert table.column_names == [
+        "file",
+        "command",
+        "core",
+        "table",
+        "row",
+        "label",
+        "column",
+        "value",
+    ]
+
+
+@pytest.mark.parametrize(
+    "show, present, absent",
+    [
+        ("full", ["  5 . regress", "regress(5-21)", "Coef."], []),
+        ("tables", ["regress(5-21)", "Coef."], ["  5 . regress"]),
+        ("summary", ["regress(5-21): 2 tables, 6 stats"], ["Coef."]),
+        ("none", [], ["regress"]),
+    ],
+)
+def test_report_log_modes(show, present, absent):
+    stream = io.StringIO()
+    out = st.OutputBuffer(stream)
+    log = st.TextLog(STATA_OUTPUT / "basic" / "regress.txt")
+    st.report_log("regress.txt", log, show, out)
+    assert stream.getvalue() == ""
+    out.flush()
+    for text in present:
+        assert text in stream.getvalue()
+    for text in absent:
+        assert text not in stream.getvalue()
+
+
+def test_bad_jobs_exits(monkeypatch):
+    monkeypatch.setattr("sys.argv", ["statistically", "--jobs", "x", "log.txt"])
+    with pytest.raises(SystemExit, match="--jobs must be a whole number"):
+        st.main()
+
+
+@pytest.mark.parametrize(
+    "args, message",
+    [
+        (["--format", "bogus", "log.txt"], "--format must be one of"),
+        (["--output", "out", "log.txt"], "--output needs --format"),
+    ],
+)
+def test_bad_export_options_exit(monkeypatch, args, message):
+    monkeypatch.setattr("sys.argv", ["statistically", *args])
+    with pytest.raises(SystemExit, match=message):
+        st.main()
+
+
+def test_watch_output_needs_no_format():
+    args = ["watch", "logs", "--output", "out"]
+    assert st.pop_export(args, watching=True) == (None, "out")
+    assert args == ["watch", "logs"]
+
+
+def test_jobs_warns_that_full_lists_no_lines(caplog):
+    assert st.pop_show(["--show", "tables"], jobs=2) == "tables"
+    assert not caplog.records
+    assert st.pop_show([], jobs=2) == "full"
+    assert "lists no log lines" in caplog.text
+
+
+def test_report_log_without_buffer_prints(capsys):
+    log = st.TextLog(STATA_OUTPUT / "basic" / "regress.txt")
+    st.report_log("regress.txt", log, "summary")
+    assert "regress(5-21): 2 tables, 6 stats" in capsys.readouterr().out
+
+
+def test_report_log_json():
+    stream = io.StringIO()
+    out = st.OutputBuffer(stream)
+    log = st.TextLog(STATA_OUTPUT / "basic" / "regress.txt")
+    st.report_log("regress.txt", log, "json", out)
+    out.flush()
+    reported = json.loads(stream.getvalue())
+    regress = reported["commands"][0]
+    assert (regress["command"], regress["start"], regress["end"]) == ("regress", 5, 21)
+    assert regress["tables"][1]["rows"][0][0] == "weight"
+    assert regress["stats"]["Number of obs"] == "74"
+
+
+@pytest.mark.parametrize("commands", [1, 7, 30])
+def test_synthetic_logs_parse(tmp_path, commands):
+    log = write_log(tmp_path / "synthetic.log", commands)
+    parsed = st.TextLog(log)
+    # plus the opening `log using` and closing `log close`
+    assert len(parsed.commands) == commands + 2
+    tables = [t for items in parsed.cmd_dict.values() for t in items[:-1]]
+    assert len(tables) >= commands
+
+
+def test_textlog_profile_counts_stages():
+    log = st.TextLog(STATA_OUTPUT / "basic" / "regress.txt", profile=True)
+    counts = log.profile.counts
+    assert (counts["lines"], counts["commands"], counts["tables"]) == (22, 2, 2)
+    assert log.profile.calls["tables"] == log.profile.calls["dataframes"] == 2
+    assert set(log.profile.seconds) == {
+        "classify",
+        "commands",
+        "find_tables",
+        "tables",
+        "dataframes",
+        "stats",
+    }
+    assert st.ParseProfile.active is None
+    assert st.TextLog(STATA_OUTPUT / "basic" / "regress.txt").profile is None
+
+
+def test_lazy_textlog_profiles_later_parsing():
+    log = st.TextLog(STATA_OUTPUT / "basic" / "regress.txt", lazy=True, profile=True)
+    assert "tables" not in log.profile.calls
+    log.cmd_dict[log.find("regress")[0]]
+    assert log.profile.calls["tables"] == 2
+
+
+def test_report_profiles_per_file_and_total(capsys):
+    memory = st.ParseProfile(memory=True)
+    with memory.activated():
+        st.TextLog(STATA_OUTPUT / "basic" / "regress.txt")
+    assert memory.peak_memory > 0
+    logs = st.load_logs([str(p) for p in STATA_OUTPUT.glob("basic/regress*.txt")])
+    reported = [*st.report_profiles(logs)]
+    err = capsys.readouterr().err
+    assert err.count("find_tables") == len(reported) + 1
+    assert "\nAll files\n" in err
+
+
+def test_coefficient_table_across_logs():
+    logs = [
+        (name, st.TextLog(STATA_OUTPUT / "basic" / f"{name}.txt"))
+        for name in ["regress", "logit"]
+    ]
+    models = [*collect_models(logs)]
+    assert [m.name for m in models] == ["regress:regress(5-21)", "logit:logit(5-26)"]
+    table = coefficient_table(models, stats=["Number of obs", "Pseudo R2"])
+    assert [*table.index] == [
+        "weight",
+        "foreign",
+        "mpg",
+        "_cons",
+        "Number of obs",
+        "Pseudo R2",
+    ]
+    assert table.loc["weight", ("regress:regress(5-21)", "coef")] == "-.0065879"
+    assert table.loc["mpg", ("logit:logit(5-26)", "se")] == ".0919175"
+    assert table.loc["mpg", ("regress:regress(5-21)", "coef")] == ""
+    assert table.loc["Pseudo R2", ("logit:logit(5-26)", "coef")] == "0.3966"
+
+
+def test_coefficient_table_many_models_typed():
+    models = [
+        ModelResults(
+            f"m{m}",
+            [f"x{v}" for v in range(m)] + ["_cons"],
+            [[str(v), "0.5"] for v in range(m + 1)],
+            {"Number of obs": str(m)},
+        )
+        for m in range(1, 501)
+    ]
+    table = coefficient_table(models, typed=True)
+    assert table.shape == (500 + 1 + 2, 500 * 2)
+    assert table.index[-3] == "_cons"
+    assert table.loc["_cons", ("m500", "coef")] == 500
+    assert table[("m1", "coef")].isna().sum() == 499 + 1
+
+
+def test_corpus_index_finds_labels_by_command(tmp_path):
+    index = CorpusIndex()
+    logs = sorted(STATA_OUTPUT.glob("basic/*.txt"))
+    assert index.update(logs) == [str(p) for p in logs]
+    regress = str(STATA_OUTPUT / "basic" / "regress.txt")
+    assert index.find(core="regress", label="foreign") == {
+        Location(regress, "regress(5-21)", 1)
+    }
+    assert {loc.file for loc in index.find(label="foreign")} > {regress}
+    assert index.find(core="regress", stat="R-squared") == {
+        Location(regress, "regress(5-21)")
+    }
+    assert index.find(core="regress", label="nonesuch") == set()
+    assert index.update(logs) == []
+
+    index.save(tmp_path / "corpus.index")
+    loaded = CorpusIndex.load(tmp_path / "corpus.index")
+    assert loaded.find(core="regress", label="foreign") == index.find(
+        core="regress", label="foreign"
+    )
+
+
+def test_corpus_index_replaces_changed_files(tmp_path):
+    log = tmp_path / "one.log"
+    log.write_text((STATA_OUTPUT / "basic" / "regress.txt").read_text())
+    index = CorpusIndex()
+    index.add_log(str(log), st.TextLog(log))
+    assert index.find(core="regress")
+    assert index.update([log]) == []
+    log.write_text((STATA_OUTPUT / "basic" / "logit.txt").read_text())
+    assert index.update([log]) == [str(log)]
+    assert not index.find(core="regress")
+    assert "Log likelihood" in index.stats
+    assert "R-squared" not in index.stats
+
+
+@pytest.mark.parametrize("name", ["basic/fitstat.txt", "adhoc/estat_vif_prob.txt"])
+def test_corpus_index_readds_repeated_labels(name):
+    log = str(STATA_OUTPUT / name)
+    index = CorpusIndex()
+    index.add_file(log)
+    found = {term: set(items) for term, items in index.labels.items()}
+    index.add_file(log)
+    assert index.labels == found
+    index.remove(log)
+    assert not index.labels and not index.commands and not index.stats
+
+
+def test_corpus_store_round_trip(tmp_path):
+    logs = sorted(STATA_OUTPUT.glob("basic/*.txt"))
+    with CorpusStore(tmp_path / "corpus.db") as store:
+        assert store.ingest_many(logs) == [str(p) for p in logs]
+        assert store.ingest_many(logs) == []
+        regress = store.cells(core="regress", label="weight")
+        assert [*regress["column"]] == ["mpg", "Coef.", "Std. Err.", "t"] + [
+            "P>|t|",
+            "[95% Conf.",
+            "Interval]",
+        ]
+        assert regress["value"][1] == "-.0065879"
+        stats = store.stats(stat="Number of obs")
+        assert set(stats["core"]) >= {"regress", "logit", "nbreg"}
+
+    log = tmp_path / "changing.log"
+    log.write_text((STATA_OUTPUT / "basic" / "regress.txt").read_text())
+    with CorpusStore(tmp_path / "corpus.db") as store:
+        assert store.ingest(log)
+        log.write_text((STATA_OUTPUT / "basic" / "logit.txt").read_text())
+        assert store.ingest(log)
+        cores = store.query(
+            "SELECT core FROM commands JOIN files ON files.id = file_id"
+            " WHERE path = ?",
+            [str(log)],
+        )
+        assert "logit" in set(cores["core"])
+        assert "regress" not in set(cores["core"])
+        assert store.cells(core="regress", label="foreign")["file"].nunique() == 1
+
+
+def test_parse_log_async_matches_textlog():
+    path = STATA_OUTPUT / "basic" / "regress.txt"
+    parsed = asyncio.run(parse_log_async(path))
+    log = st.TextLog(path)
+    assert parsed.lines == log.lines
+    assert [*map(str, parsed.cmd_dict)] == [*map(str, log.cmd_dict)]
+    for parsed_items, items in zip(parsed.cmd_dict.values(), log.cmd_dict.values()):
+        assert parsed_items[-1] == items[-1]
+        assert all(a.equals(b) for a, b in zip(parsed_items[:-1], items[:-1]))
+
+
+@pytest.mark.parametrize("ordered", [False, True])
+def test_iter_logs_async(ordered):
+    pattern = str(STATA_OUTPUT / "basic" / "*.txt")
+
+    async def collect():
+        return [name async for name, _ in iter_logs_async(pattern, 3, None, ordered)]
+
+    names = asyncio.run(collect())
+    assert sorted(names) == sorted(str(p) for p in STATA_OUTPUT.glob("basic/*.txt"))
+    if ordered:
+        assert names == sorted(names)
+
+
+def test_iter_logs_async_stops_early_in_processes():
+    pattern = str(STATA_OUTPUT / "basic" / "*.txt")
+
+    async def first(executor):
+        logs = iter_logs_async(pattern, limit=2, executor=executor)
+        async for name, log in logs:
+            await logs.aclose()
+            return name, log
+
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        name, log = asyncio.run(first(executor))
+    assert [*map(str, log.commands)] == [*map(str, st.TextLog(name).commands)]
+
+
+def test_directory_watcher_waits_for_files_to_settle(tmp_path):
+    regress = (STATA_OUTPUT / "basic" / "regress.txt").read_text()
+    log = tmp_path / "one.log"
+    log.write_text(regress[:100])
+    (tmp_path / "notes.md").write_text("not a log")
+    sent = []
+    watcher = DirectoryWatcher(tmp_path, sent.append, settle=5)
+    assert watcher.poll(now=0) == []
+    log.write_text(regress)
+    assert watcher.poll(now=4) == []
+    assert watcher.poll(now=8) == []
+    assert watcher.poll(now=9) == [str(log)]
+    assert watcher.poll(now=20) == []
+
+    # a restart remembers what was done, but notices what changed
+    (tmp_path / "two.txt").write_text(regress)
+    restarted = DirectoryWatcher(tmp_path, sent.append, settle=0)
+    assert restarted.poll(now=0) == []
+    assert restarted.poll(now=0) == [str(tmp_path / "two.txt")]
+    assert sent == [str(log), str(tmp_path / "two.txt")]
+
+
+def test_directory_watcher_exports(tmp_path):
+    incoming = tmp_path / "incoming"
+    incoming.mkdir()
+    (incoming / "regress.log").write_text(
+        (STATA_OUTPUT / "basic" / "regress.txt").read_text()
+    )
+    watcher = DirectoryWatcher(incoming, export_sink(tmp_path / "out"), settle=0)
+    watcher.poll(now=0)
+    watcher.poll(now=0)
+    stats = (tmp_path / "out" / "regress.log" / "stats.jsonl").read_text()
+    assert '"stat": "R-squared"' in stats
+
+
+def test_registered_parsers_by_command_type(monkeypatch):
+    monkeypatch.setattr(st, "PARSERS", dict(st.PARSERS))
+    log = st.TextLog(STATA_OUTPUT / "various" / "longer.txt")
+    (gen,) = log.find("gen")
+    assert log.cmd_dict[gen] == [{}]
+    summarize, *_ = log.find("summarize")
+    assert len(log.cmd_dict[summarize]) == 2
+
+    @st.register_parser("regress")
+    def stats_only(lines, kinds=None):
+        return [], {"lines": str(len(lines))}
+
+    assert st.PARSERS["regress"] is stats_only
+    regress = st.TextLog(STATA_OUTPUT / "basic" / "regress.txt")
+    assert [*regress.cmd_dict.values()][0] == [{"lines": "17"}]
+    lines = regress.lines[regress.commands[0].slice]
+    assert st.TextLog.parse_command(lines) == ([], {"lines": "17"})
+    assert st.TextLog.parse_command(lines, core="probit")[1]["R-squared"] == "0.6627"
+
+
+FACTOR_REGRESS = """\
+. regress mpg i.rep78
+
+      Source |       SS           df       MS      Number of obs   =        69
+-------------+----------------------------------   F(4, 64)        =      4.91
+       Model |  549.415777         4  137.353944   Prob > F        =    0.0016
+    Residual |  1790.78712        64  27.9810488   R-squared       =    0.2348
+-------------+----------------------------------   Adj R-squared   =    0.1869
+       Total |   2340.2029        68  34.4147485   Root MSE        =    5.2897
+
+------------------------------------------------------------------------------
+         mpg |      Coef.   Std. Err.      t    P>|t|     [95% Conf. Interval]
+-------------+----------------------------------------------------------------
+       rep78 |
+          2  |     -1.875   4.181884    -0.45   0.655    -10.22927    6.479274
+          3  |  -1.566667   3.863059    -0.41   0.686    -9.284014    6.150681
+             |
+       _cons |         21   3.740391     5.61   0.000     13.52771    28.47229
+------------------------------------------------------------------------------
+"""
+ROBUST_REGRESS = """\
+. regress mpg weight, vce(robust)
+
+Linear regression                               Number of obs     =         74
+                                                F(1, 72)          =     140.45
+                                                R-squared         =     0.6515
+
+------------------------------------------------------------------------------
+             |               Robust
+         mpg |      Coef.   Std. Err.      t    P>|t|     [95% Conf. Interval]
+-------------+----------------------------------------------------------------
+      weight |  -.0060087   .0005070   -11.85   0.000    -.0070194    -.004998
+       _cons |   39.44028   1.987169    19.85   0.000     35.47897    43.40159
+------------------------------------------------------------------------------
+"""
+
+
+def regress_command_lines(source):
+    if source == "factor":
+        return [FACTOR_REGRESS.splitlines()]
+    if source == "synthetic":
+        lines = ["", *synthetic_lines(40, ["regress"])]
+    else:
+        lines = ["", *(STATA_OUTPUT / source).read_text().splitlines()]
+    commands = st.Command.get_commands(lines)
+    return [lines[cmd.slice] for cmd in commands if cmd.core == "regress"]
+
+
+def found_as_lists(found):
+    found_tables, found_stats = found
+    return [(t.columns, t.rows) for t in found_tables], found_stats
+
+
+@pytest.mark.parametrize(
+    "source", ["basic/regress.txt", "various/longer.txt", "synthetic", "factor"]
+)
+def test_regress_parser_matches_generic(source):
+    commands = regress_command_lines(source)
+    assert commands
+    for lines in commands:
+        assert st.read_regress_layout(lines) is not None
+        assert found_as_lists(st.regress_parser(lines)) == found_as_lists(
+            st.generic_parser(lines)
+        )
+
+
+def test_regress_parser_falls_back_for_other_layouts():
+    lines = ROBUST_REGRESS.splitlines()
+    assert st.read_regress_layout(lines) is None
+    found_tables, found_stats = st.regress_parser(lines)
+    assert found_stats["F(1, 72)"] == "140.45"
+    assert found_as_lists(st.regress_parser(lines)) == found_as_lists(
+        st.generic_parser(lines)
+    )
+
+
+def test_table_from_rows():
+    table = st.Table.from_rows(["x", "Coef."], [("a", "1"), ("b", "2")])
+    assert table.to_compact().rows() == [("a", "1"), ("b", "2")]
+    assert table.to_df(typed=True)["Coef."].tolist() == [1, 2]
+
+
+@pytest.mark.parametrize("option", ["--interval", "--settle"])
+@pytest.mark.parametrize("value", ["soon", "-1", "nan"])
+def test_watch_rejects_bad_seconds(tmp_path, option, value):
+    with pytest.raises(SystemExit, match=f"{option} must be a number of seconds"):
+        watch_from_args([str(tmp_path), option, value])
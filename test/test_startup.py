@@ -0,0 +1,39 @@
+# type: ignore
+import subprocess
+import sys
+
+import pytest
+
+HEAVY_MODULES = ["numpy", "pandas"]
+
+
+def run_python(*args):
+    return subprocess.run(
+        [sys.executable, *args], check=True, capture_output=True, text=True
+    )
+
+
+@pytest.mark.parametrize(
+    "module",
+    [
+        "statistically",
+        "statistically.statistically",
+        "statistically.batch",
+        "statistically.cache",
+        "statistically.follow",
+    ],
+)
+def test_import_leaves_heavy_modules_unloaded(module):
+    code = f"import sys, {module}; print(*sorted(sys.modules))"
+    loaded = run_python("-c", code).stdout.split()
+    assert not set(HEAVY_MODULES) & set(loaded)
+
+
+def test_version_does_not_load_heavy_modules():
+    code = (
+        "import sys; sys.argv = ['statistically', '--version']; "
+        "from statistically.statistically import main; main(); "
+        "print(*sorted(sys.modules))"
+    )
+    loaded = run_python("-c", code).stdout.split()
+    assert not set(HEAVY_MODULES) & set(loaded)
@@ -1,4 +1,6 @@
 # type: ignore
+import math
+
 import pytest
 
 from statistically import statistically as st
@@ -20,6 +22,22 @@ def test_find_line(line, code):
     assert st.TextLog.find_line(line) == code
 
 
+@pytest.mark.parametrize(
+    "lines, codes",
+    [
+        (["ab-", "--", "", "x", "= 5"], " h   "),
+        (["x |", "|+", " | y"], "ccc"),
+    ],
+)
+def test_classify_lines_stays_within_lines(lines, codes):
+    kinds = st.classify_lines(lines)
+    assert kinds.translate(st.TABLE_CODES).decode() == codes
+    assert kinds.translate(st.TABLE_CODES).decode() == "".join(
+        st.TextLog.find_line(l) for l in lines
+    )
+    assert not any(k & st.LINE_EQUATION for k in kinds)
+
+
 @pytest.mark.parametrize(
     "lines, boundaries",
     [
@@ -95,6 +113,30 @@ def test_multiple_equations(line, result):
     assert dict(st.EquationBuilder(line)) == result
 
 
+def test_equations_keep_line_numbers():
+    lines = [
+        "Negative binomial regression                    Number of obs     =         21",
+        "                                                LR chi2(2)        =       0.14",
+        "Log likelihood = -108.48841                     Pseudo R2         =     0.0007",
+        "Iteration 0:   log likelihood = -108.48841",
+    ]
+    equations = st.EquationBuilder(lines)
+    assert equations.keys() == [
+        "Number of obs",
+        "LR chi2(2)",
+        "Log likelihood",
+        "Pseudo R2",
+    ]
+    assert equations["Log likelihood"] == "-108.48841"
+    assert equations.typed()["LR chi2(2)"] == 0.14
+    assert equations.line_numbers == {
+        "Number of obs": 0,
+        "LR chi2(2)": 1,
+        "Log likelihood": 2,
+        "Pseudo R2": 2,
+    }
+
+
 @pytest.mark.parametrize(
     "full_list, slices",
     (
@@ -107,6 +149,58 @@ def test_make_slices(full_list, slices):
     assert [*st.make_slices(full_list)] == slices
 
 
+@pytest.mark.parametrize(
+    "lines, columns",
+    [
+        (["ab  | c", "a   + cd"], [0, 1, 6, 7]),
+        (["  x", "", "y |"], [0, 2]),
+        (["| +", " | "], []),
+    ],
+)
+def test_find_useful_columns(lines, columns):
+    assert st.Table.find_useful_columns(lines) == columns
+    separators = st.Table.separator_mask(st.Table.char_matrix(lines))
+    assert st.Table.column_slices(separators) == [*st.make_slices(columns)]
+    assert st.mask_slices(st.occupied_mask(lines)) == [*st.make_slices(columns)]
+
+
+def test_table_layout_reused_only_when_columns_match():
+    lines = [
+        "-------------+------------",
+        "         mpg |      Coef.",
+        "-------------+------------",
+        "      weight |  -.0065879",
+        "-------------+------------",
+    ]
+    st.Table.layouts.clear()
+    first = st.Table(lines)
+    assert len(st.Table.layouts) == 1
+    profile = st.ParseProfile()
+    with profile.activated():
+        again = st.Table(lines[:3] + ["      weight |  -.1234567"] + lines[4:])
+        wider = st.Table(lines[:3] + ["      weight | -12.0065879"] + lines[4:])
+    assert profile.counts["layouts reused"] == 1
+    assert again.columns == first.columns
+    assert again.rows == [("weight", "-.1234567")]
+    assert wider.rows == [("weight", "-12.0065879")]
+
+    # a header line with no words: the names run on into the first row
+    bare = lines[:1] + ["             |", *lines[1:]]
+    weight = st.Table(bare)
+    height = st.Table([l.replace("weight", "height") for l in bare])
+    assert weight.columns[0] == "mpg weight"
+    assert height.columns[0] == "mpg height"
+
+
+def test_parse_columns_keeps_short_lines_short():
+    lines = ["name |  one  two", "x    |  1"]
+    assert st.Table.parse_columns(lines) == [
+        ["name", "x   "],
+        ["one", "1"],
+        ["two", ""],
+    ]
+
+
 @pytest.mark.parametrize(
     "inlist, outlist",
     [
@@ -182,9 +276,6 @@ def test_sort_variables(inlist, outlist):
     assert st.sort_variable_lists(inlist) == outlist
 
 
-@pytest.mark.xfail(
-    reason="Harder to deal with misarranged lists...", raises=AssertionError
-)
 @pytest.mark.parametrize(
     "inlist, outlist",
     [
@@ -201,9 +292,6 @@ def test_accept_first_sort_of_missorted_variables(inlist, outlist):
     assert st.sort_variable_lists(inlist) == outlist
 
 
-@pytest.mark.xfail(
-    reason="incompatible sort, with a before/after gf and gu", raises=RuntimeError
-)
 @pytest.mark.parametrize(
     "inlist, outset",
     [
@@ -216,7 +304,7 @@ def test_accept_first_sort_of_missorted_variables(inlist, outlist):
                 "sr sb gf gu zrf zru zbf zbu a u2 i9 iE i N".split(),
                 "sr sb gf gu zrf zru zbf zbu a u2 i9 iE i N".split(),
             ],
-            "sr sb gf gu zrf zru zbf zbu a u2 i9 iE i N",
+            "sr sb gf gu zrf zru zbf zbu a sc.ar sc.ab u2 i9 iE i N".split(),
         ),
         (
             [
@@ -228,7 +316,21 @@ def test_accept_first_sort_of_missorted_variables(inlist, outlist):
     ],
 )
 def test_wrongly_duplicating(inlist, outset):
-    assert set(st.sort_variable_lists(inlist)) == set(outset)
+    sorted_list = st.sort_variable_lists(inlist)
+    assert set(sorted_list) == set(outset)
+    assert len(sorted_list) == len(outset)
+
+
+def test_sort_interleaved_variables():
+    # each list skips some of the others' items
+    inlist = ["a c e".split(), "a b c".split(), "b d e f".split(), "a f g".split()]
+    assert st.sort_variable_lists(inlist) == "a b c d e f g".split()
+
+
+def test_sort_many_long_lists():
+    covariates = [f"x{i}" for i in range(3000)]
+    inlist = [covariates[: 10 * m] + ["_cons"] for m in range(1, 301)]
+    assert st.sort_variable_lists(inlist) == covariates + ["_cons"]
 
 
 @pytest.mark.parametrize(
@@ -242,3 +344,25 @@ def test_wrongly_duplicating(inlist, outset):
 def test_raise_on_duplicates(inlist):
     with pytest.raises(ValueError):
         st.sort_variable_lists(inlist)
+
+
+@pytest.mark.parametrize(
+    "value, typed",
+    [
+        ("74", 74),
+        ("-.0065879", -0.0065879),
+        ("0.0000", 0.0),
+        ("69.75", 69.75),
+        ("1,234", 1234),
+        ("1.5e-03", 0.0015),
+        ("mean", "mean"),
+        ("1960-1967", "1960-1967"),
+    ],
+)
+def test_typed_value(value, typed):
+    assert st.typed_value(value) == typed
+
+
+@pytest.mark.parametrize("value", [".", ".a", " . "])
+def test_typed_value_missing(value):
+    assert math.isnan(st.typed_value(value))